@@ -8,7 +8,9 @@ version = "0.1.6"
 with open("README.md", encoding="utf-8") as readme_file:
     readme = readme_file.read()
 
-requirements = ["click>=7.1", "xlrd==1.2.0", "pywebio"]
+# tornado 5.0: IOLoop.run_in_executor and the asyncio event loop, used by the
+# web server's handlers next to pywebio
+requirements = ["click>=7.1", "xlrd==1.2.0", "pywebio", "tornado>=5.0"]
 
 setup(
     name="sqlgen",
@@ -0,0 +1,213 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Generate DDL of many template files concurrently
+"""
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from sqlgen import parallel, reader, timing
+from sqlgen.exceptions import SQLGenException
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = (".xlsx",)
+
+
+def _is_template(path):
+    # skip lock files left by MS Excel, eg: ~$book.xlsx
+    return path.suffix.lower() in TEMPLATE_SUFFIXES and not path.name.startswith("~$")
+
+
+def is_batch_pattern(pattern):
+    """whether `pattern` names several templates, a directory or a glob, even
+    if it matches only one
+    """
+    return Path(pattern).is_dir() or (
+        not Path(pattern).is_file() and glob.has_magic(pattern)
+    )
+
+
+def expand_paths(patterns):
+    """expand files, directories and glob patterns into template files
+    @param: patterns: paths of files or directories, or glob patterns
+    @return: list of unique file paths, in the order given
+    """
+    files = list()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matched = sorted(_ for _ in path.rglob("*") if _is_template(_))
+        elif path.is_file():
+            matched = [path]
+        elif glob.has_magic(pattern):
+            matched = sorted(
+                Path(_)
+                for _ in glob.glob(pattern, recursive=True)
+                if Path(_).is_file() and _is_template(Path(_))
+            )
+        else:
+            raise FileNotFoundError(f"No such file or directory: {pattern}")
+        if not matched:
+            logger.warning(f"No template files found in {pattern}")
+        files.extend(matched)
+    return list(dict.fromkeys(files))
+
+
+def output_paths(files, output_dir, suffix=".sql"):
+    """path of DDL file of each template under `output_dir`, relative to the
+    common directory of templates, so that templates of the same name in
+    different directories do not overwrite each other
+    @return: dict of template file path to output path
+    @raise: ValueError: two templates map to the same output path
+    """
+    files = [Path(_) for _ in files]
+    if not files:
+        return dict()
+    root = os.path.commonpath([str(_.resolve().parent) for _ in files])
+    paths = dict()
+    seen = dict()
+    for file in files:
+        relative = file.resolve().parent.relative_to(root)
+        path = Path(output_dir).joinpath(relative, f"{file.stem}{suffix}")
+        key = os.path.normcase(str(path))
+        if key in seen:
+            raise ValueError(
+                f"Templates {seen[key]} and {file} would both be written "
+                f"into {path}"
+            )
+        seen[key] = file
+        paths[file] = path
+    return paths
+
+
+class FileResult:
+    """result of generating DDL from one template file"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.clauses = list()
+        self.tables = 0
+        self.fields = 0
+        self.seconds = 0.0
+        self.error = None
+
+    def __repr__(self):
+        return (
+            f"FileResult("
+            f"file_path={str(self.file_path)!r},"
+            f"tables={self.tables!r},"
+            f"fields={self.fields!r},"
+            f"seconds={self.seconds!r},"
+            f"error={self.error!r}"
+            f")"
+        )
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def run_file(
+    file_path, sheets, read_type="excel", cache=None, style="compat", intern=False
+):
+    """generate DDL of sheets from one file, errors are reported in the result
+    instead of raised, so that a bad file does not abort the whole batch
+    """
+    result = FileResult(file_path)
+    start = time.perf_counter()
+    try:
+        with reader.open_workbook(file_path, read_type) as book:
+            for sheet in sheets:
+                with timing.sheet(f"{Path(file_path).name}:{sheet}"):
+                    table = parallel.parse_sheet(book, sheet, cache, intern)
+                    with timing.span("render"):
+                        result.clauses.append(table.clause(style))
+                result.tables += 1
+                result.fields += len(table.columns)
+    except Exception as e:
+        result.error = (
+            str(e) if isinstance(e, SQLGenException) else f"{type(e).__name__}: {e}"
+        )
+        result.clauses, result.tables, result.fields = list(), 0, 0
+        logger.debug(f"Failed to generate DDL from {file_path}: {result.error}")
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run(
+    files,
+    sheets,
+    jobs=1,
+    read_type="excel",
+    cache=None,
+    style="compat",
+    intern=False,
+):
+    """generate DDL of sheets from every file, yield `FileResult` in files order
+    @param: files: paths of template files
+    @param: sheets: indexes of Excel worksheets of each file
+    @param: jobs: number of worker processes, 1 means run in current process
+    @param: read_type: reader backend, see `reader.READ_TYPES`
+    @param: cache: `cache.TemplateCache` of parsed templates, None to disable
+    @param: style: layout of DDL, see `render.STYLES`
+    @param: intern: share identical fields across tables of each process, see
+        `ddlgenerator.FieldInterner`
+    """
+    files = list(files)
+    sheets = list(sheets)
+    worker = partial(
+        run_file,
+        sheets=sheets,
+        read_type=read_type,
+        cache=cache,
+        style=style,
+        intern=intern,
+    )
+    jobs = min(jobs, len(files)) or 1
+    if jobs <= 1:
+        yield from map(worker, files)
+        return
+
+    logger.debug(f"Process {len(files)} files with {jobs} worker processes")
+    if timing.active() is None:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(worker, files)
+        return
+
+    # spans recorded in worker processes are sent back with results
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for result, recorder in executor.map(partial(timing.recording, worker), files):
+            timing.merge(recorder)
+            yield result
+
+
+def summary(results):
+    """format per file summary of batch results as a text table"""
+    header = ("file", "tables", "fields", "time(s)", "error")
+    rows = [
+        (
+            str(r.file_path),
+            str(r.tables),
+            str(r.fields),
+            f"{r.seconds:.3f}",
+            r.error or "",
+        )
+        for r in results
+    ]
+    failed = sum(1 for r in results if not r.ok)
+    rows.append(
+        (
+            f"total: {len(results)} files, {failed} failed",
+            str(sum(r.tables for r in results)),
+            str(sum(r.fields for r in results)),
+            f"{sum(r.seconds for r in results):.3f}",
+            "",
+        )
+    )
+    return timing.format_rows(header, rows)
@@ -0,0 +1,280 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Content addressed on-disk cache of parsed templates, and in-memory LRU cache
+
+Entries are keyed by hash of file content, sheet index, reader backend and
+sqlgen version, and evicted least recently used first once the cache grows
+over its size limit.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from sqlgen import __version__, reader, timing
+from sqlgen.filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_DIR_ENV = "SQLGEN_CACHE_DIR"
+CACHE_MAX_BYTES_ENV = "SQLGEN_CACHE_MAX_BYTES"
+
+
+def file_hash(file_path):
+    """sha256 hex digest of file content, or of in-memory workbook"""
+    if isinstance(file_path, (bytes, bytearray, memoryview, mmap.mmap)):
+        return hashlib.sha256(file_path).hexdigest()
+    elif hasattr(file_path, "getbuffer"):
+        return hashlib.sha256(file_path.getbuffer()).hexdigest()
+
+    digest = hashlib.sha256()
+    if hasattr(file_path, "read"):
+        file_path.seek(0)
+        for chunk in iter(lambda: file_path.read(1024 * 1024), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# memoized digests by file path, size and modified time
+_digests = dict()
+_max_digests = 4096
+
+
+def file_digest(file_path):
+    """hash of file content, memoized until the file is modified"""
+    if reader.is_in_memory(file_path):
+        return file_hash(file_path)
+    stat = os.stat(file_path)
+    memo_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+    value = _digests.get(memo_key)
+    if value is None:
+        if len(_digests) >= _max_digests:
+            _digests.clear()
+        value = _digests[memo_key] = file_hash(file_path)
+    return value
+
+
+class LRUCache:
+    """bounded, thread safe in-memory cache, least recently used entries are
+    dropped first
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return (
+            f"LRUCache("
+            f"maxsize={self.maxsize!r},"
+            f"size={len(self)!r},"
+            f"hits={self.hits!r},"
+            f"misses={self.misses!r}"
+            f")"
+        )
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate):
+        """drop entries whose key matches `predicate`, return number dropped"""
+        with self._lock:
+            keys = [_ for _ in self._data if predicate(_)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TemplateCache:
+    """on-disk cache of `reader.parse` results
+
+    usage:
+        cache = TemplateCache(".cache/templates")
+        with reader.open_workbook(file_path) as book:
+            template = cache.parse(book, index=0)
+    """
+
+    suffix = ".pickle"
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    def __repr__(self):
+        return (
+            f"TemplateCache("
+            f"cache_dir={str(self.cache_dir)!r},"
+            f"max_bytes={self.max_bytes!r}"
+            f")"
+        )
+
+    def __getstate__(self):
+        # counters are per process
+        return {"cache_dir": self.cache_dir, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["cache_dir"], state["max_bytes"])
+
+    @classmethod
+    def from_env(cls):
+        """cache configured by environment variables, None if not enabled"""
+        cache_dir = os.environ.get(CACHE_DIR_ENV)
+        if not cache_dir:
+            return
+        max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV) or DEFAULT_MAX_BYTES)
+        return cls(cache_dir, max_bytes)
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _path(self, digest, index, read_type):
+        key = f"{digest}:{index}:{read_type}:{__version__}".encode("utf8")
+        name = hashlib.sha256(key).hexdigest()
+        return self.cache_dir.joinpath(name[:2], name + self.suffix)
+
+    def get(self, digest, index=0, read_type="excel"):
+        path = self._path(digest, index, read_type)
+        try:
+            with open(path, "rb") as f:
+                template = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            timing.count("template_cache_misses")
+            return
+        except Exception as e:
+            logger.debug(f"Drop broken cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            timing.count("template_cache_misses")
+            return
+        # mark as recently used, eviction goes by modified time
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        timing.count("template_cache_hits")
+        return template
+
+    def put(self, digest, index, read_type, template):
+        path = self._path(digest, index, read_type)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # an entry written again replaces the old one, not adds to it
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        # write then rename, readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(template, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        if self._size is not None:
+            self._size += path.stat().st_size - replaced
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def parse(self, book, index=0):
+        """`reader.parse` sheet of opened workbook session through cache"""
+        digest = file_digest(book.file_path)
+        template = self.get(digest, index, book.read_type)
+        if template is None:
+            template = reader.parse(
+                book.file_path, read_type=book.read_type, index=index, book=book
+            )
+            self.put(digest, index, book.read_type, template)
+        return template
+
+    def _entries(self):
+        entries = list()
+        for path in self.cache_dir.glob(f"*/*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # evicted by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """total bytes of entries, scanned once then tracked on writes"""
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def evict(self, max_bytes=None):
+        """delete least recently used entries until cache fits in `max_bytes`"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # one process evicts at a time, others would delete the same entries
+        with FileLock(self.cache_dir.joinpath(".lock")):
+            return self._evict(max_bytes)
+
+    def _evict(self, max_bytes):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self._size = total
+        if evicted:
+            logger.debug(f"Evicted {evicted} entries from {self.cache_dir}")
+        return evicted
+
+    def clear(self):
+        return self.evict(max_bytes=0)
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Precompiled catalog of MySQL keywords and classes of data types
+
+Lookups are frozen sets built once from `sqlgen.reserved`. Values of several
+words, such as "ON UPDATE CURRENT_TIMESTAMP", are split and checked once,
+then remembered, templates repeat the same few of them on every field.
+"""
+import re
+from functools import lru_cache
+
+_whitespace = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def _is_keywords(words):
+    # leading or trailing whitespace leaves an empty word, never a keyword
+    return KEYWORDS.issuperset(_whitespace.split(words))
+
+
+def is_reserved_words(words):
+    """whether every whitespace separated word of `words` is a keyword
+    @param: words: str, or list or tuple of str
+    """
+    if isinstance(words, str):
+        return words in KEYWORDS or _is_keywords(words)
+    elif isinstance(words, (list, tuple)):
+        return all(w in KEYWORDS or _is_keywords(w) for w in words)
+    return False
+
+
+# `sqlgen.reserved` re-exports is_reserved_words, lookups are built once it is
+# defined so that either module can be imported first
+from sqlgen import reserved  # noqa: E402
+
+KEYWORDS = frozenset(reserved.sql_reserved_words)
+
+NUMERIC = frozenset(reserved.NUMERIC)
+DATE_AND_TIME = frozenset(reserved.DATE_AND_TIME)
+STRING = frozenset(reserved.STRING)
+DEFAULT_EMPTY_STRING = frozenset(reserved.DEFAULT_EMPTY_STRING)
@@ -1,14 +1,33 @@
 #!/usr/bin/python
 # -*- coding: utf8
+import cProfile
+import json
+import logging
 import os
 import re
 import sys
+import time
+from functools import partial
+from pathlib import Path
 
 import click
 
-from sqlgen import __version__, ddlgenerator, reader
+from sqlgen import (
+    __version__,
+    batch,
+    cache,
+    ddlgenerator,
+    parallel,
+    reader,
+    render,
+    sink,
+    timing,
+)
+from sqlgen.exceptions import SheetError
 from sqlgen.log import configure_logger
 
+logger = logging.getLogger(__name__)
+
 
 def parse_sheets(arg):
     sheets = list()
@@ -43,11 +62,14 @@ def version_msg():
 
 @click.command(context_settings=dict(help_option_names=["-h", "--help"]))
 @click.version_option(__version__, "-V", "--version", message=version_msg())
+@click.argument("templates", nargs=-1)
 @click.option(
     "-t",
     "--template",
-    type=click.Path(exists=True, readable=True),
-    help="file template",
+    type=str,
+    multiple=True,
+    help="file template, directory or glob pattern, can be repeated, "
+    "'-' reads the workbook from stdin",
 )
 @click.option(
     "-s",
@@ -57,30 +79,301 @@ def version_msg():
     show_default=True,
     help="index of excel sheets, eg: 1-6",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="number of processes to parse sheets (one template) "
+    "or files (many templates) in parallel, default 1 for one template "
+    "and CPU count for many",
+)
+@click.option(
+    "-r",
+    "--read-type",
+    type=click.Choice(reader.READ_TYPES),
+    default="excel",
+    show_default=True,
+    help="reader backend, xlsx streams .xlsx with standard library only",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar=cache.CACHE_DIR_ENV,
+    default=None,
+    help=f"Cache parsed templates in this directory, env: {cache.CACHE_DIR_ENV}",
+)
+@click.option(
+    "--cache-max-bytes",
+    type=click.IntRange(min=0),
+    envvar=cache.CACHE_MAX_BYTES_ENV,
+    default=cache.DEFAULT_MAX_BYTES,
+    show_default=True,
+    help="Evict least recently used cache entries over this size",
+)
+@click.option(
+    "--no-cache", is_flag=True, default=False, help="Bypass the template cache"
+)
 @click.option("-o", "--output", type=click.Path(), help="Save task template into file")
+@click.option(
+    "--style",
+    type=click.Choice(render.STYLES),
+    default="compat",
+    show_default=True,
+    help="Layout of DDL, compat as sqlgen always wrote it, pretty one column "
+    "per line, compact one statement per line",
+)
+@click.option(
+    "--intern",
+    is_flag=True,
+    default=False,
+    help="Share identical field definitions across tables, so each is "
+    "validated and rendered once, pays off when most tables repeat fields",
+)
+@click.option(
+    "-z",
+    "--gzip",
+    "compress",
+    is_flag=True,
+    default=None,
+    help="Compress DDL output with gzip, default for '-o' ending with .gz",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Save DDL of each template into <output-dir>/<template name>.sql, "
+    "under its directory relative to the common directory of templates",
+)
 @click.option(
     "--debug-file",
     type=click.Path(),
     default=None,
     help="File to be used as a stream for DEBUG logging",
 )
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print seconds spent in each stage and sheet to stderr",
+)
+@click.option(
+    "--profile-format",
+    type=click.Choice(["table", "json"]),
+    default="table",
+    show_default=True,
+    help="Format of '--profile' output",
+)
+@click.option(
+    "--profile-dump",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Save cProfile stats of the main process into file, for pstats " "or snakeviz",
+)
 @click.option(
     "-v", "--verbose", is_flag=True, default=False, help="Print debug information"
 )
-def main(template, sheets, output, verbose, debug_file):
+def main(
+    templates,
+    template,
+    sheets,
+    jobs,
+    read_type,
+    cache_dir,
+    cache_max_bytes,
+    no_cache,
+    output,
+    style,
+    intern,
+    compress,
+    output_dir,
+    profile,
+    profile_format,
+    profile_dump,
+    verbose,
+    debug_file,
+):
     configure_logger(stream_level="DEBUG" if verbose else "INFO", debug_file=debug_file)
 
-    clauses = list()
-    for sheet in parse_sheets(sheets):
-        template_data = reader.parse(template, index=sheet)
-        table = ddlgenerator.parse(template_data)
-        sql = table.clause()
-        clauses.append(sql)
+    patterns = list(template) + list(templates)
+    if not patterns:
+        raise click.UsageError("Missing option '-t' / '--template'.")
+    if "-" in patterns:
+        if len(patterns) > 1 or output_dir:
+            raise click.UsageError(
+                "Template '-' (stdin) can not be used with other templates "
+                "or '--output-dir'."
+            )
+        # workbook content is parsed from memory, never saved to disk
+        files = [sys.stdin.buffer.read()]
+    else:
+        try:
+            files = batch.expand_paths(patterns)
+        except FileNotFoundError as e:
+            raise click.BadParameter(str(e), param_hint="'-t' / '--template'")
+        if not files:
+            raise click.BadParameter(
+                f"No templates matched {', '.join(patterns)}",
+                param_hint="'-t' / '--template'",
+            )
+    sheets = parse_sheets(sheets)
+    template_cache = None
+    if cache_dir and not no_cache:
+        template_cache = cache.TemplateCache(cache_dir, cache_max_bytes)
+
+    # directories and globs run as batch however many templates they match
+    if len(files) > 1 or output_dir or any(map(batch.is_batch_pattern, patterns)):
+        task = partial(
+            run_batch,
+            files,
+            sheets,
+            jobs or os.cpu_count(),
+            read_type,
+            output,
+            output_dir,
+            template_cache,
+            compress,
+            style,
+            intern,
+        )
+    else:
+        task = partial(
+            run_one,
+            files[0],
+            sheets,
+            jobs or 1,
+            read_type,
+            output,
+            template_cache,
+            compress,
+            style,
+            intern,
+        )
+
+    try:
+        if profile or profile_dump:
+            run_profiled(task, profile_format if profile else None, profile_dump)
+        else:
+            task()
+    finally:
+        log_interner(ddlgenerator.field_interner)
+
+
+def log_interner(interner):
+    # fields parsed in worker processes are interned there, not counted here
+    if not interner.misses:
+        return
+    total = interner.hits + interner.misses
+    logger.debug(
+        f"Fields interned: {interner.hits} of {total} ({interner.hit_ratio:.1%}), "
+        f"{len(interner)} distinct definitions validated and rendered"
+    )
 
-    clauses = "\n".join(clauses)
 
-    if output:
-        with open(output, "w") as f:
-            f.write(clauses)
+def run_one(
+    file_path,
+    sheets,
+    jobs=1,
+    read_type="excel",
+    output=None,
+    template_cache=None,
+    compress=None,
+    style="compat",
+    intern=False,
+):
+    # each table is written as soon as it is generated, in sheets order
+    with sink.open_sink(output, compress) as out:
+        try:
+            for clause in parallel.generate(
+                file_path,
+                sheets,
+                jobs=jobs,
+                read_type=read_type,
+                cache=template_cache,
+                style=style,
+                intern=intern,
+            ):
+                out.write(clause)
+        except SheetError as e:
+            raise click.ClickException(str(e))
+
+
+def run_profiled(task, profile_format="table", profile_dump=None):
+    """run `task` recording timing spans, print them to stderr in
+    `profile_format` (None not to print), save cProfile stats to `profile_dump`
+    """
+    profiler = cProfile.Profile() if profile_dump else None
+    start = time.perf_counter()
+    with timing.record() as recorder:
+        try:
+            if profiler is not None:
+                profiler.enable()
+            task()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile_dump)
+            wall = time.perf_counter() - start
+            if profile_format == "json":
+                summary = dict(recorder.summary(), wall=wall)
+                click.echo(json.dumps(summary, indent=2), err=True)
+            elif profile_format == "table":
+                click.echo(f"wall time: {wall:.4f}s\n", err=True)
+                click.echo(recorder.format_table(), err=True)
+
+
+def run_batch(
+    files,
+    sheets,
+    jobs,
+    read_type="excel",
+    output=None,
+    output_dir=None,
+    template_cache=None,
+    compress=None,
+    style="compat",
+    intern=False,
+):
+    if output_dir:
+        suffix = ".sql.gz" if compress else ".sql"
+        try:
+            sql_files = batch.output_paths(files, output_dir, suffix)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        out = None
     else:
-        print(clauses)
+        out = sink.open_sink(output, compress, end="\n")
+
+    results = list()
+    try:
+        for result in batch.run(
+            files,
+            sheets,
+            jobs=jobs,
+            read_type=read_type,
+            cache=template_cache,
+            style=style,
+            intern=intern,
+        ):
+            results.append(result)
+            if not result.ok:
+                continue
+            if output_dir:
+                sql_file = sql_files[Path(result.file_path)]
+                sql_file.parent.mkdir(parents=True, exist_ok=True)
+                with sink.file_sink(sql_file, compress) as file_out:
+                    for clause in result.clauses:
+                        file_out.write(clause)
+            else:
+                for clause in result.clauses:
+                    out.write(clause)
+            # only counts are kept for the summary
+            result.clauses.clear()
+    finally:
+        if out is not None:
+            out.close()
+
+    click.echo(batch.summary(results), err=True)
+    if any(not r.ok for r in results):
+        sys.exit(1)
@@ -2,17 +2,27 @@
 # -*- coding: utf8
 
 import logging
+from operator import itemgetter
 
-from sqlgen import reserved
+from sqlgen import catalog, render, timing
+from sqlgen.catalog import is_reserved_words
 from sqlgen.exceptions import InValidReservedWords, InValidTemplate
-from sqlgen.reserved import is_reserved_words
 
 logger = logging.getLogger(__name__)
 
 
-class Field:
-    def __init__(
-        self,
+class Field(tuple):
+    """column of table, immutable once created
+
+    Values are normalized and validated once on creation, the column clause is
+    rendered on first use and kept. Fields are tuples, built in one step
+    without per attribute assignments.
+    """
+
+    __slots__ = ()
+
+    def __new__(
+        cls,
         name,
         data_type,
         length=None,
@@ -22,15 +32,47 @@ class Field:
         comment=None,
         key=None,
     ):
-        self.Name = name
-        self.Type = data_type
-        self.Length = length
-        self.Extra = extra_attributes
-        self.Null = null
-        self.Default = default
-        self.Comment = comment
-        self.Key = key
-        self._judge()
+        default = cls._judge_default(data_type, default)
+        length = cls._judge_length(data_type, length)
+        judge_reserved_words = cls._judge_reserved_words
+        judge_reserved_words(data_type)
+        if extra_attributes:
+            judge_reserved_words(extra_attributes)
+        if key:
+            judge_reserved_words(key)
+        if not name:
+            raise InValidTemplate(f"Invalid template, empty field name: {name!r}")
+
+        if extra_attributes is not None:
+            extra_attributes = tuple(extra_attributes)
+        # last item holds the padded and trimmed clauses once rendered
+        return tuple.__new__(
+            cls,
+            (
+                name,
+                data_type,
+                length,
+                extra_attributes,
+                null,
+                default,
+                comment,
+                key,
+                [None, None],
+            ),
+        )
+
+    Name = property(itemgetter(0))
+    Type = property(itemgetter(1))
+    Length = property(itemgetter(2))
+    Extra = property(itemgetter(3))
+    Null = property(itemgetter(4))
+    Default = property(itemgetter(5))
+    Comment = property(itemgetter(6))
+    Key = property(itemgetter(7))
+
+    def __reduce__(self):
+        # values are validated already, unpickled without judging them again
+        return _restore_field, (tuple(self[:8]),)
 
     def __hash__(self):
         return hash(self.Name)
@@ -53,76 +95,76 @@ class Field:
             f")"
         )
 
-    def clause(self):
-        if isinstance(self.Length, int):
-            dtype = f"{self.Type}({self.Length})"
-        elif isinstance(self.Length, tuple):
-            dtype = f"{self.Type}{self.Length!r}"
+    def clause(self, padded=True):
+        """column clause, `padded` keeps a blank for each empty part as sqlgen
+        always did, else empty parts are left out; rendered once
+        """
+        cache = self[8]
+        index = 0 if padded else 1
+        clause = cache[index]
+        if clause is None:
+            clause = cache[index] = self._render(padded)
+        return clause
+
+    def _render(self, padded=True):
+        name, data_type, length, extra, null, default, comment = self[:7]
+        if isinstance(length, int):
+            dtype = f"{data_type}({length})"
+        elif isinstance(length, tuple):
+            dtype = f"{data_type}{length!r}"
         else:
-            dtype = self.Type
+            dtype = data_type
 
-        null = "NOT NULL" if not self.Null else ""
+        null = "NOT NULL" if not null else ""
 
-        if (
-            isinstance(self.Default, (int, float))
-            or is_reserved_words(self.Default)
-            or isinstance(self.Default, str)
-        ):
-            default = f"DEFAULT {self.Default}"
+        if isinstance(default, (int, float, str)) or is_reserved_words(default):
+            default = f"DEFAULT {default}"
         else:
             default = ""
 
-        extra = " ".join(self.Extra or list())
-        comment = f"COMMENT '{self.Comment}'" if self.Comment else ""
-
-        sql_str = f"`{self.Name}` {dtype} {null} {default} {extra} {comment}"
-        return sql_str
+        extra = " ".join(extra) if extra else ""
+        comment = f"COMMENT '{comment}'" if comment else ""
 
-    def _judge(self):
-        self._judge_default()
-        self._judge_length()
-        self._judge_reserved_words(self.Type)
-        for word in [self.Extra, self.Key]:
-            if word:
-                self._judge_reserved_words(word)
-        if not self.Name:
-            raise InValidTemplate(f"Invalid template, empty field name: {self.Name!r}")
+        if padded:
+            return f"`{name}` {dtype} {null} {default} {extra} {comment}"
+        parts = (f"`{name}`", dtype, null, default, extra, comment)
+        return " ".join(filter(None, parts))
 
     @staticmethod
     def _judge_reserved_words(words):
         if not is_reserved_words(words):
             raise InValidReservedWords(f"invalid sql reserverd words: {words}")
 
-    def _judge_default(self):
+    @staticmethod
+    def _judge_default(data_type, default):
         # 处理布尔负默认值
-        if not self.Default:
-            if self.Type in reserved.DEFAULT_EMPTY_STRING:
-                self.Default = '""'
-            elif self.Type in reserved.NUMERIC:
-                if self.Default == 0:
-                    self.Default = 0
-                else:
-                    self.Default = None
-            else:
-                self.Default = None
+        if not default:
+            if data_type in catalog.DEFAULT_EMPTY_STRING:
+                return '""'
+            elif data_type in catalog.NUMERIC:
+                return 0 if default == 0 else None
+            return None
 
         # 处理数值类型默认值
-        elif isinstance(self.Default, (int, float)):
+        elif isinstance(default, (int, float)):
             # 去除 .0 小数位
-            if isinstance(self.Default, float) and (self.Default % 1) == 0.0:
-                self.Default = int(self.Default)
+            if isinstance(default, float) and (default % 1) == 0.0:
+                default = int(default)
             # 数值类型单元格的数据适配字符串类型字段
-            if self.Type in reserved.DEFAULT_EMPTY_STRING:
-                self.Default = str(self.Default)
+            if data_type in catalog.DEFAULT_EMPTY_STRING:
+                default = str(default)
 
         # 处理字符串类型默认值
-        elif isinstance(self.Default, str):
-            if not is_reserved_words(self.Default):
-                self.Default = f'"{self.Default}"'
+        elif isinstance(default, str):
+            if not is_reserved_words(default):
+                default = f'"{default}"'
+        return default
 
-    def _judge_length(self):
-        if self.Type in reserved.DATE_AND_TIME:
-            self.Length = None
+    @staticmethod
+    def _judge_length(data_type, length):
+        if data_type in catalog.DATE_AND_TIME:
+            return None
+        return length
 
     def is_primary(self):
         return self.Key == "PRIMARY"
@@ -146,9 +188,7 @@ class Table:
         comment="",
     ):
         self.name = name
-        self.pk = self.find_pk(columns)
-        self.uk = self.find_uk(columns)
-        self.idx = self.find_index(columns)
+        self.pk, self.uk, self.idx = self.classify(columns)
         self.columns = columns
         self.engine = engine
         self.charset = charset
@@ -157,30 +197,36 @@ class Table:
         self.comment = comment
 
     @staticmethod
-    def find_pk(columns):
+    def classify(columns):
+        """primary key, unique key and index columns, in one pass
+        @return: (first primary key column or None, unique key columns,
+            index columns)
+        """
+        pk, uk, idx = None, list(), list()
         for _ in columns:
-            if _.is_primary():
-                return _
-        return
+            if _.Key == "PRIMARY":
+                if pk is None:
+                    pk = _
+            elif _.Key == "UNIQUE":
+                uk.append(_)
+            elif _.Key == "INDEX":
+                idx.append(_)
+        return pk, uk, idx
+
+    @staticmethod
+    def find_pk(columns):
+        return Table.classify(columns)[0]
 
     @staticmethod
     def find_uk(columns):
-        uk = list()
-        for _ in columns:
-            if _.is_unique():
-                uk.append(_)
-        return uk
+        return Table.classify(columns)[1]
 
     @staticmethod
     def find_index(columns):
-        idx = list()
-        for _ in columns:
-            if _.is_index():
-                idx.append(_)
-        return idx
+        return Table.classify(columns)[2]
 
-    def clause(self):
-        columns = "\t\t, ".join([f"{c.clause()}\n" for c in self.columns])
+    def keys(self):
+        """primary key, index and unique key clauses"""
         keys = list()
         if self.pk:
             keys.append(f"PRIMARY KEY `pk_{self.pk.Name}` (`{self.pk.Name}`)")
@@ -196,8 +242,12 @@ class Table:
             else:
                 uk_name = f"uk_{self.uk[0].Name}"
             keys.append(f"UNIQUE KEY `{uk_name}` ({uk})")
+        return keys
 
-        keys = "\t, ".join([f"{k}\n" for k in keys])
+    def options(self):
+        """engine, auto increment, charset, row format and comment options,
+        "" if not set
+        """
         engine = f"ENGINE={self.engine}" if self.engine else ""
         auto_increment = (
             f"AUTO_INCREMENT={self.auto_increment}"
@@ -207,35 +257,137 @@ class Table:
         charset = f"DEFAULT CHARSET={self.charset}" if self.charset else ""
         row_format = f"ROW_FORMAT={self.row_format}" if self.row_format else ""
         comment = f"COMMENT='{self.comment}'" if self.comment else ""
-        sql_str = f"""
-CREATE TABLE 
-    IF NOT EXISTS `{self.name}`
-    (
-      \t\t{columns}
-      \t, {keys}
+        return (engine, auto_increment, charset, row_format, comment)
+
+    def clause(self, style="compat"):
+        """CREATE TABLE statement, see `render.STYLES`"""
+        return render.render(self, style)
+
+
+def _restore_field(values):
+    return tuple.__new__(Field, values + ([None, None],))
+
+
+def _key(c):
+    """intern key of field template, its raw values; 1, 1.0 and True are
+    equal keys yet may render differently, so the classes of values that are
+    rendered as they are, not only by truth, are part of the key
+    """
+    name = c["Name"]
+    length = c["Length"]
+    default = c["Default"]
+    comment = c["Comment"]
+    extra = c["Extra"]
+    return (
+        name,
+        c["Type"],
+        length,
+        tuple(extra) if extra else None,
+        c["Null"],
+        default,
+        comment,
+        c["Key"],
+        name.__class__,
+        length.__class__,
+        default.__class__,
+        comment.__class__,
     )
-    {engine} {auto_increment} {charset} {row_format} {comment}
-;
-"""
-        return sql_str
 
 
-def parse(template):
+class FieldInterner:
+    """flyweight pool of fields, identical column definitions across tables
+    share one immutable `Field`, so it is validated and rendered once
+
+    usage:
+        interner = FieldInterner()
+        table = parse(template, interner=interner)
+    """
+
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._fields = dict()
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return (
+            f"FieldInterner("
+            f"maxsize={self.maxsize!r},"
+            f"size={len(self)!r},"
+            f"hits={self.hits!r},"
+            f"misses={self.misses!r}"
+            f")"
+        )
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def field(self, c):
+        """`Field` of field template `c`, shared with identical ones"""
+        try:
+            key = _key(c)
+            field = self._fields.get(key)
+        except TypeError:
+            # unhashable values of JSON templates, not interned
+            return _field(c)
+
+        if field is not None:
+            self.hits += 1
+            return field
+        field = _field(c)
+        if len(self._fields) >= self.maxsize:
+            self._fields.clear()
+        self._fields[key] = field
+        self.misses += 1
+        return field
+
+    def clear(self):
+        self._fields.clear()
+
+
+def _field(c):
+    # positional, keyword arguments cost more than the rest of the call
+    return Field(
+        c["Name"],
+        c["Type"],
+        c["Length"],
+        c["Extra"],
+        c["Null"],
+        c["Default"],
+        c["Comment"],
+        c["Key"],
+    )
+
+
+# fields shared by tables parsed in this process
+field_interner = FieldInterner()
+
+
+def parse(template, interner=None):
+    """table of template
+    @param: interner: `FieldInterner` sharing fields across tables, e.g.
+        `field_interner` of this process, None to create every field
+    """
     table_name = template["Table"]
     table_name_zh = template["Table_zh"]
-    columns = list()
-    for c in template["Fields"]:
-        field = Field(
-            name=c["Name"],
-            data_type=c["Type"],
-            length=c["Length"],
-            extra_attributes=c["Extra"],
-            null=c["Null"],
-            comment=c["Comment"],
-            default=c["Default"],
-            key=c["Key"],
-        )
-        columns.append(field)
+    # fields are validated as they are created, one span for all of them
+    if interner is None:
+        with timing.span("build.judge"):
+            columns = [_field(c) for c in template["Fields"]]
+        interned = 0
+    else:
+        hits = interner.hits
+        with timing.span("build.judge"):
+            columns = [interner.field(c) for c in template["Fields"]]
+        interned = interner.hits - hits
+        timing.count("fields_interned", interned)
+    timing.count("fields_created", len(columns) - interned)
+    logger.debug(f"Table: {table_name}\tFields: {len(columns)}\tInterned: {interned}")
 
     engine = template.get("ENGINE") or "InnoDB"
     charset = template.get("CHARSET") or "utf8mb4"
@@ -16,3 +16,35 @@ class InValidReservedWords(SQLGenException):
 
 class InValidTemplate(SQLGenException):
     pass
+
+
+class SheetError(SQLGenException):
+    """failed to generate DDL from one sheet of the workbook"""
+
+    def __init__(self, sheet, message):
+        super().__init__(sheet, message)
+        self.sheet = sheet
+        self.message = message
+
+    def __str__(self):
+        return f"sheet {self.sheet}: {self.message}"
+
+
+class ServerBusy(SQLGenException):
+    pass
+
+
+class TaskTimeout(SQLGenException):
+    pass
+
+
+class UploadTooLarge(SQLGenException):
+    """upload rejected, it is larger than the limit"""
+
+    def __init__(self, name, max_bytes):
+        super().__init__(name, max_bytes)
+        self.name = name
+        self.max_bytes = max_bytes
+
+    def __str__(self):
+        return f"{self.name} is larger than {self.max_bytes} bytes"
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Advisory lock of a file shared by threads and processes
+
+Web server processes share the document store and the template cache on
+disk, writers take the lock for read-modify-write of shared files, while
+file contents are still replaced atomically so readers never need it.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # no flock on Windows, where one server process is supported only
+    fcntl = None
+
+
+class FileLock:
+    """reentrant lock of threads in this process and of other processes
+
+    usage:
+        with FileLock(".cache/.lock"):
+            ...
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __repr__(self):
+        return f"FileLock(path={self.path!r})"
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self, blocking=True):
+        """return False if `blocking` is False and the lock is held elsewhere"""
+        if not self._lock.acquire(blocking):
+            return False
+        if self._depth == 0 and fcntl is not None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                os.close(fd)
+                self._lock.release()
+                return False
+            except BaseException:
+                os.close(fd)
+                self._lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
@@ -0,0 +1,318 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Plain HTTP handlers served by the web UI's tornado server, next to PyWebIO
+"""
+import json
+import logging
+import zipfile
+
+import click
+import tornado.web
+from tornado.ioloop import IOLoop
+
+from sqlgen import metrics, parallel, timing
+from sqlgen.cache import file_hash
+from sqlgen.cli import parse_sheets
+from sqlgen.exceptions import ServerBusy, SQLGenException, TaskTimeout, UploadTooLarge
+
+logger = logging.getLogger(__name__)
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    """errors are answered as plain text message"""
+
+    def write_error(self, status_code, **kwargs):
+        _, e, _ = kwargs.get("exc_info", (None, None, None))
+        message = kwargs.get("message") or getattr(e, "log_message", None)
+        if status_code == 503:
+            self.set_header("Retry-After", "1")
+        self.set_header("Content-Type", "text/plain; charset=UTF-8")
+        self.finish(message or self._reason)
+
+
+@tornado.web.stream_request_body
+class UploadHandler(BaseHandler):
+    """stream request body of POST /upload?name=<file name> into the store
+
+    Chunks are written and hashed as they arrive, a request whose
+    Content-Length is over the limit is rejected before its body is read.
+    """
+
+    def initialize(self, store, max_bytes=0, suffixes=(".xlsx",)):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.suffixes = suffixes
+        self.upload = None
+
+    def prepare(self):
+        if self.request.method != "POST":
+            return
+        # query arguments are decoded by tornado already
+        name = self.get_query_argument("name", "").strip()
+        name = name.replace("\\", "/").rsplit("/", 1)[-1]
+        if not name.lower().endswith(self.suffixes):
+            raise tornado.web.HTTPError(
+                400, f"Expect file of {', '.join(self.suffixes)}"
+            )
+
+        if self.max_bytes:
+            length = int(self.request.headers.get("Content-Length") or 0)
+            if length > self.max_bytes:
+                raise tornado.web.HTTPError(
+                    413, str(UploadTooLarge(name, self.max_bytes))
+                )
+        self.upload = self.store.upload(name, self.max_bytes)
+
+    def data_received(self, chunk):
+        if self._finished:
+            return
+        try:
+            self.upload.write(chunk)
+        except UploadTooLarge as e:
+            # bodies without Content-Length, answer and hang up on the rest
+            self.send_error(413, message=str(e))
+            self.request.connection.close()
+
+    async def post(self):
+        # documents are indexed (sheets read) on commit, keep it off the loop
+        doc = await IOLoop.current().run_in_executor(None, self.upload.commit)
+        logger.info(f"Uploaded {doc['name']} ({doc['size']} bytes)")
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.write(json.dumps(doc, ensure_ascii=False))
+
+    def on_finish(self):
+        if self.upload is not None and self.upload.doc is None:
+            self.upload.abort()
+
+    def on_connection_close(self):
+        if self.upload is not None and self.upload.doc is None:
+            self.upload.abort()
+
+
+class GenerateHandler(BaseHandler):
+    """base of handlers generating DDL through the web UI's worker pool and
+    caches
+    """
+
+    def initialize(
+        self,
+        worker_pool,
+        ddl_cache=None,
+        template_cache=None,
+        store=None,
+        max_bytes=0,
+        observe=None,
+    ):
+        self.worker_pool = worker_pool
+        self.ddl_cache = ddl_cache
+        self.template_cache = template_cache
+        self.store = store
+        self.max_bytes = max_bytes
+        # receives `timing.Recorder` of each generation
+        self.observe = observe
+
+    def get_sheets(self):
+        try:
+            return tuple(parse_sheets(self.get_query_argument("sheets", "0")))
+        except click.BadParameter as e:
+            raise tornado.web.HTTPError(400, e.message)
+
+    def get_docs(self):
+        """stored documents of `digest` query arguments, in order"""
+        digests = list(dict.fromkeys(self.get_query_arguments("digest")))
+        if not digests:
+            raise tornado.web.HTTPError(400, "No documents selected")
+        docs = [self.store.get(digest) for digest in digests]
+        missing = [d for d, doc in zip(digests, docs) if doc is None]
+        if missing:
+            raise tornado.web.HTTPError(404, f"Missing documents: {', '.join(missing)}")
+        return docs
+
+    async def generate_doc(self, doc, sheets):
+        """[(table name, DDL)] of stored document"""
+        return await self.generate(
+            parallel.render_tables,
+            self.store.path(doc["digest"]),
+            sheets,
+            (doc["digest"], sheets),
+        )
+
+    async def generate(self, fn, template, sheets, key):
+        """result of `fn(template, sheets)` run in worker pool, cached by `key`
+        @param: fn: `parallel.render_tables` or `parallel.parse_templates`
+        @param: template: path or content of workbook
+        """
+        result = self.ddl_cache.get(key) if self.ddl_cache is not None else None
+        if result is not None:
+            return result
+        try:
+            result, recorder = await self.worker_pool.run_async(
+                timing.recording, fn, template, sheets, cache=self.template_cache
+            )
+        except ServerBusy as e:
+            raise tornado.web.HTTPError(503, str(e))
+        except TaskTimeout as e:
+            raise tornado.web.HTTPError(504, str(e))
+        except SQLGenException as e:
+            raise tornado.web.HTTPError(422, str(e))
+        if self.observe is not None:
+            self.observe(recorder)
+        if self.ddl_cache is not None:
+            self.ddl_cache.put(key, result)
+        return result
+
+
+class DDLHandler(GenerateHandler):
+    """stateless DDL generation for scripts, no PyWebIO session involved
+
+    POST /api/ddl?sheets=0-3&format=sql with .xlsx content as request body,
+    responds DDL script (format=sql, default) or templates parsed from the
+    sheets as JSON (format=json). Responses are gzipped if the client
+    accepts it, and connections are kept alive.
+
+    usage:
+        curl --compressed --data-binary @design.xlsx \\
+            'http://localhost:8080/api/ddl?sheets=0-3'
+    """
+
+    FORMATS = ("sql", "json")
+
+    async def post(self):
+        output_format = self.get_query_argument("format", "sql")
+        if output_format not in self.FORMATS:
+            raise tornado.web.HTTPError(
+                400, f"Invalid format, expect one of {', '.join(self.FORMATS)}"
+            )
+        sheets = self.get_sheets()
+        content = self.request.body
+        if not content:
+            raise tornado.web.HTTPError(400, "Expect .xlsx content as request body")
+        if self.max_bytes and len(content) > self.max_bytes:
+            raise tornado.web.HTTPError(
+                413, str(UploadTooLarge("request body", self.max_bytes))
+            )
+
+        # same keys as the web UI, DDL generated by either one serves both
+        digest = file_hash(content)
+        self.set_header("X-Content-Digest", digest)
+        if output_format == "sql":
+            tables = await self.generate(
+                parallel.render_tables, content, sheets, (digest, sheets)
+            )
+            self.set_header("Content-Type", "text/plain; charset=UTF-8")
+            # same as output of command line
+            self.write("\n".join(clause for _, clause in tables) + "\n")
+        else:
+            templates = await self.generate(
+                parallel.parse_templates, content, sheets, (digest, sheets, "json")
+            )
+            self.set_header("Content-Type", "application/json; charset=UTF-8")
+            self.write(
+                json.dumps(
+                    [
+                        {"sheet": sheet, "template": template}
+                        for sheet, template in zip(sheets, templates)
+                    ],
+                    ensure_ascii=False,
+                )
+            )
+
+
+class _ResponseStream:
+    """unseekable file object writing into response, for `zipfile`"""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def write(self, data):
+        self.handler.write(bytes(data))
+        return len(data)
+
+    def flush(self):
+        return
+
+
+class ZipHandler(GenerateHandler):
+    """GET /download/ddl.zip?digest=<digest>&digest=...&sheets=0-3
+
+    DDL of stored documents as zip archive of <document>/<table>.sql, the
+    archive is streamed entry by entry as documents are generated.
+    """
+
+    async def get(self):
+        sheets = self.get_sheets()
+        docs = self.get_docs()
+
+        self.set_header("Content-Type", "application/zip")
+        self.set_header("Content-Disposition", 'attachment; filename="ddl.zip"')
+        names = set()
+        with zipfile.ZipFile(_ResponseStream(self), "w", zipfile.ZIP_DEFLATED) as zf:
+            for doc in docs:
+                folder = doc["name"].rsplit(".", 1)[0]
+                try:
+                    tables = await self.generate_doc(doc, sheets)
+                except tornado.web.HTTPError as e:
+                    # one bad template does not spoil the others
+                    if e.status_code != 422:
+                        raise
+                    name = _unique(f"{folder}/error.txt", names)
+                    zf.writestr(name, e.log_message + "\n")
+                    continue
+                for (table, clause), sheet in zip(tables, sheets):
+                    name = _unique(f"{folder}/{table or f'sheet{sheet}'}.sql", names)
+                    zf.writestr(name, clause + "\n")
+                await self.flush()
+
+
+class SQLHandler(GenerateHandler):
+    """GET /download/ddl.sql?digest=<digest>&digest=...&sheets=0-3
+
+    DDL script of stored documents, streamed document by document as each is
+    generated, instead of joined in the session first. Documents of invalid
+    templates are left out, as in the web UI.
+    """
+
+    async def get(self):
+        sheets = self.get_sheets()
+        docs = self.get_docs()
+
+        self.set_header("Content-Type", "application/sql; charset=UTF-8")
+        self.set_header("Content-Disposition", 'attachment; filename="ddl.sql"')
+        written = 0
+        for doc in docs:
+            try:
+                tables = await self.generate_doc(doc, sheets)
+            except tornado.web.HTTPError as e:
+                if e.status_code != 422:
+                    raise
+                logger.info(f"Skip {doc['name']}: {e.log_message}")
+                continue
+            for _, clause in tables:
+                if written:
+                    self.write("\n")
+                self.write(clause)
+                written += 1
+            await self.flush()
+
+
+def _unique(name, names):
+    """name not in `names` yet, by suffix -1, -2, ..."""
+    stem, suffix = name.rsplit(".", 1)
+    i = 0
+    while name in names:
+        i += 1
+        name = f"{stem}-{i}.{suffix}"
+    names.add(name)
+    return name
+
+
+class MetricsHandler(BaseHandler):
+    """GET /metrics, metrics of `metrics.Registry` in Prometheus text format"""
+
+    def initialize(self, registry):
+        self.registry = registry
+
+    def get(self):
+        self.set_header("Content-Type", metrics.CONTENT_TYPE)
+        self.write(self.registry.render())
@@ -0,0 +1,182 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Metrics in Prometheus text exposition format, only standard library
+
+usage:
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ["code"]))
+    requests.inc(code="200")
+    text = registry.render()
+
+Labels of the registry, such as the worker process, are added to every series.
+"""
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds, from a cached lookup up to a slow workbook
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}("
+            f"name={self.name!r},"
+            f"labelnames={self.labelnames!r}"
+            f")"
+        )
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Expect labels {self.labelnames} of {self.name}, got {tuple(labels)}"
+            )
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """list of (suffix, labels, value)"""
+        with self._lock:
+            return [("", key, value) for key, value in self._values.items()]
+
+    def render(self, const_labels=()):
+        """text of metric, `const_labels` (name, value) pairs lead the labels
+        of every sample
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples():
+            labels = _format_labels(const_labels + tuple(labels))
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """value read from `fn` on each scrape, fn returns a number, or a dict of
+    label values tuple to number if the gauge has labels
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, fn, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        if not self.labelnames:
+            return [("", (), value)]
+        return [
+            ("", tuple(zip(self.labelnames, label_values)), v)
+            for label_values, v in value.items()
+        ]
+
+
+class FunctionCounter(Gauge):
+    """counter read from `fn` on each scrape, for counts kept by other objects"""
+
+    kind = "counter"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = list()
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = key + (("le", _format_value(bound)),)
+                samples.append(("_bucket", labels, cumulative))
+            samples.append(("_sum", key, total))
+            samples.append(("_count", key, cumulative))
+        return samples
+
+
+class Registry:
+    def __init__(self, const_labels=None):
+        self.metrics = list()
+        self.const_labels = dict()
+        if const_labels:
+            self.set_labels(**const_labels)
+
+    def __repr__(self):
+        return (
+            f"Registry("
+            f"metrics={[_.name for _ in self.metrics]!r},"
+            f"const_labels={self.const_labels!r}"
+            f")"
+        )
+
+    def set_labels(self, **labels):
+        """labels of every series, such as the process of a forked server"""
+        self.const_labels.update((k, str(v)) for k, v in labels.items())
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        const_labels = tuple(self.const_labels.items())
+        return "\n".join(_.render(const_labels) for _ in self.metrics) + "\n"
@@ -0,0 +1,161 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Generate DDL of workbook sheets, serially or across a process pool
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlgen import ddlgenerator, reader, timing
+from sqlgen.exceptions import SheetError
+
+logger = logging.getLogger(__name__)
+
+# workbook session opened once per worker process, template cache, style of
+# DDL, whether to intern fields, and whether to send timing spans back to the
+# parent process
+_book = None
+_cache = None
+_style = "compat"
+_intern = False
+_profile = False
+
+
+def _init_worker(
+    file_path,
+    read_type="excel",
+    cache=None,
+    style="compat",
+    intern=False,
+    profile=False,
+):
+    global _book, _cache, _style, _intern, _profile
+    _book = reader.open_workbook(file_path, read_type)
+    _cache = cache
+    _style = style
+    _intern = intern
+    _profile = profile
+
+
+def _parse_template(book, sheet, cache=None):
+    if cache is not None:
+        return cache.parse(book, index=sheet)
+    return reader.parse(
+        book.file_path, read_type=book.read_type, index=sheet, book=book
+    )
+
+
+def parse_sheet(book, sheet, cache=None, intern=False):
+    """parse one sheet of a workbook session into `ddlgenerator.Table`
+    @param: book: `reader.open_workbook` session
+    @param: sheet: index of Excel worksheet
+    @param: cache: `cache.TemplateCache`, None to always parse the workbook
+    @param: intern: share identical fields across tables of this process
+    """
+    interner = ddlgenerator.field_interner if intern else None
+    try:
+        with timing.span("parse"):
+            template = _parse_template(book, sheet, cache)
+        with timing.span("build"):
+            return ddlgenerator.parse(template, interner=interner)
+    except SheetError:
+        raise
+    except Exception as e:
+        # keep the error picklable, original exception may be not
+        raise SheetError(sheet, f"{type(e).__name__}: {e}") from e
+
+
+def _generate(book, sheet, cache=None, style="compat", intern=False):
+    with timing.sheet(sheet):
+        table = parse_sheet(book, sheet, cache, intern)
+        with timing.span("render"):
+            return table.name, table.clause(style)
+
+
+def _generate_in_worker(sheet):
+    if _profile:
+        return timing.recording(_generate, _book, sheet, _cache, _style, _intern)
+    return _generate(_book, sheet, _cache, _style, _intern), None
+
+
+def generate_tables(
+    file_path,
+    sheets,
+    jobs=1,
+    read_type="excel",
+    cache=None,
+    style="compat",
+    intern=False,
+):
+    """generate DDL of sheets, yield (table name, SQL) in the same order as
+    `sheets`, see `generate`
+    """
+    sheets = list(sheets)
+    jobs = min(jobs, len(sheets)) or 1
+    if jobs <= 1:
+        with reader.open_workbook(file_path, read_type) as book:
+            for sheet in sheets:
+                yield _generate(book, sheet, cache, style, intern)
+        return
+
+    logger.debug(f"Parse {len(sheets)} sheets with {jobs} worker processes")
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(
+            file_path,
+            read_type,
+            cache,
+            style,
+            intern,
+            timing.active() is not None,
+        ),
+    ) as executor:
+        for table, recorder in executor.map(_generate_in_worker, sheets):
+            timing.merge(recorder)
+            yield table
+
+
+def generate(
+    file_path,
+    sheets,
+    jobs=1,
+    read_type="excel",
+    cache=None,
+    style="compat",
+    intern=False,
+):
+    """generate DDL of sheets, yield SQL in the same order as `sheets`
+    @param: file_path: name of excel file
+    @param: sheets: indexes of Excel worksheets
+    @param: jobs: number of worker processes, 1 means run in current process
+    @param: read_type: reader backend, see `reader.READ_TYPES`
+    @param: cache: `cache.TemplateCache` of parsed templates, None to disable
+    @param: style: layout of DDL, see `render.STYLES`
+    @param: intern: share identical fields across tables, see
+        `ddlgenerator.FieldInterner`
+    """
+    for _, clause in generate_tables(
+        file_path, sheets, jobs, read_type, cache, style, intern
+    ):
+        yield clause
+
+
+def parse_templates(file_path, sheets, read_type="excel", cache=None):
+    """templates of sheets as parsed by `reader.parse`, picklable entry for
+    worker pools
+    """
+    templates = list()
+    with reader.open_workbook(file_path, read_type) as book:
+        for sheet in sheets:
+            try:
+                with timing.span("parse"):
+                    templates.append(_parse_template(book, sheet, cache))
+            except Exception as e:
+                raise SheetError(sheet, f"{type(e).__name__}: {e}") from e
+    return templates
+
+
+def render_tables(file_path, sheets, read_type="excel", cache=None):
+    """list of (table name, DDL) of sheets, picklable entry for worker pools"""
+    return list(generate_tables(file_path, sheets, read_type=read_type, cache=cache))
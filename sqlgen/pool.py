@@ -0,0 +1,191 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Bounded worker pool to run DDL generation off the web server threads
+"""
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from sqlgen.exceptions import ServerBusy, TaskTimeout
+
+logger = logging.getLogger(__name__)
+
+POOL_KINDS = ("process", "thread")
+
+# least default limit of queued plus running tasks, a small pool still takes
+# a burst of concurrent users instead of rejecting them
+MIN_QUEUE = 32
+
+
+class WorkerPool:
+    """pool of workers with a limit on queued plus running tasks
+
+    usage:
+        pool = WorkerPool(max_workers=4, max_queue=32, timeout=60)
+        tables = await pool.run_async(parallel.render_tables, file_path, sheets)
+        for tables in pool.starmap(parallel.render_tables, [(path, sheets), ...]):
+            ...
+    """
+
+    def __init__(self, max_workers=None, max_queue=None, timeout=None, kind="process"):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Invalid pool kind: {kind!r}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue or max(self.max_workers * 8, MIN_QUEUE)
+        self.timeout = timeout
+        self.kind = kind
+        self.rejected = 0
+        self.timeouts = 0
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __repr__(self):
+        return (
+            f"WorkerPool("
+            f"kind={self.kind!r},"
+            f"max_workers={self.max_workers!r},"
+            f"max_queue={self.max_queue!r},"
+            f"timeout={self.timeout!r}"
+            f")"
+        )
+
+    @classmethod
+    def from_env(cls, processes=1):
+        """pool configured by SQLGEN_WORKERS, SQLGEN_MAX_QUEUE, SQLGEN_TIMEOUT
+        and SQLGEN_POOL (process or thread)
+        @param: processes: number of server processes on the host, each with
+            its own pool, the default workers (CPU count) and queue are
+            divided among them, SQLGEN_WORKERS and SQLGEN_MAX_QUEUE are per
+            process
+        """
+        timeout = os.environ.get("SQLGEN_TIMEOUT")
+        max_workers = int(os.environ.get("SQLGEN_WORKERS") or 0) or max(
+            (os.cpu_count() or 1) // processes, 1
+        )
+        return cls(
+            max_workers=max_workers,
+            max_queue=int(os.environ.get("SQLGEN_MAX_QUEUE") or 0) or None,
+            timeout=float(timeout) if timeout else 60,
+            kind=os.environ.get("SQLGEN_POOL") or "process",
+        )
+
+    @property
+    def depth(self):
+        """number of tasks queued or running"""
+        return self._depth
+
+    @property
+    def executor(self):
+        # created on first use, so that importing web module spawns nothing
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    executor_class = (
+                        ProcessPoolExecutor
+                        if self.kind == "process"
+                        else ThreadPoolExecutor
+                    )
+                    self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    def _done(self, future):
+        with self._lock:
+            self._depth -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        """submit task, raise `ServerBusy` if the queue is full"""
+        with self._lock:
+            if self._depth >= self.max_queue:
+                self.rejected += 1
+                raise ServerBusy(
+                    f"Server busy, {self._depth} tasks in queue, please retry later"
+                )
+            self._depth += 1
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._depth -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """run task and wait for its result, raise `TaskTimeout` after timeout"""
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # a task already running can not be stopped, it still counts in
+            # queue depth until it finishes
+            future.cancel()
+            self.timeouts += 1
+            raise TaskTimeout(f"Task timed out after {timeout} seconds")
+
+    def map(self, fn, items, window=None, timeout=None, return_exceptions=False):
+        """yield `fn(item)` of items in order, as soon as each one is done,
+        with at most `window` (default the pool size, never over the queue
+        limit) tasks in flight, tasks not started yet are cancelled once the
+        caller stops iterating
+        @param: return_exceptions: yield exception of a failed or timed out
+            task in place of its result, instead of raising it
+        """
+        return self._map(fn, items, False, window, timeout, return_exceptions)
+
+    def starmap(self, fn, items, window=None, timeout=None, return_exceptions=False):
+        """`map` of `fn(*item)`, items are tuples of arguments"""
+        return self._map(fn, items, True, window, timeout, return_exceptions)
+
+    def _map(self, fn, items, star, window, timeout, return_exceptions):
+        timeout = self.timeout if timeout is None else timeout
+        window = min(window or self.max_workers, self.max_queue)
+        items = iter(items)
+        futures = deque()
+
+        def submit(item):
+            futures.append(self.submit(fn, *item) if star else self.submit(fn, item))
+
+        try:
+            for item in itertools.islice(items, window):
+                submit(item)
+            while futures:
+                try:
+                    result = futures.popleft().result(timeout=timeout)
+                except FutureTimeoutError:
+                    self.timeouts += 1
+                    result = TaskTimeout(f"Task timed out after {timeout} seconds")
+                    if not return_exceptions:
+                        raise result
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    result = e
+                for item in itertools.islice(items, 1):
+                    submit(item)
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def run_async(self, fn, *args, timeout=None, **kwargs):
+        """`run` for event loops, wait for the result without blocking a thread"""
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TaskTimeout(f"Task timed out after {timeout} seconds")
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
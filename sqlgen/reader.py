@@ -2,22 +2,100 @@
 # -*- coding: utf8
 
 import logging
+import mmap
 import re
+import zipfile
 
 import xlrd
+from xlrd import xlsx
+from xlrd.sheet import Sheet
 
+from sqlgen import timing
+from sqlgen.catalog import is_reserved_words
 from sqlgen.exceptions import InValidReservedWords, InValidTemplate
-from sqlgen.reserved import is_reserved_words
+from sqlgen.xlsx import XlsxWorkbook, file_object, is_in_memory, source_name
 
 logger = logging.getLogger(__name__)
 
 
+READ_TYPES = ("excel", "xlsx")
+
+HEADER = {
+    "字段名称": "Field",
+    "字段中文名": "Comment",
+    "字段类型": "Type",
+    "字段长度": "Length",
+    "能否为空": "Null",
+    "默认值": "Default",
+    "字段属性": "Key",
+    "附加属性": "Extra",
+}
+
+
+# kinds of rows, classified by the first cell
+DB_NAME = "db_name"
+TABLE_NAME = "table_name"
+TABLE_NAME_ZH = "table_name_zh"
+HEADER_ROW = "header"
+SEQ_ROW = "seq"
+
+ROW_KINDS = {
+    "库名": DB_NAME,
+    "表名": TABLE_NAME,
+    "表中文名": TABLE_NAME_ZH,
+    "序号": HEADER_ROW,
+    "seq": HEADER_ROW,
+}
+
+
 def parse(file_path, read_type="excel", **kwargs):
+    """parse worksheet into template
+    @param: file_path: path of workbook, or its content as bytes, BytesIO or
+        memory-mapped file
+    @param: read_type: reader backend, see `READ_TYPES`
+    """
     if read_type == "excel":
         return Excel.parse(file_path, **kwargs)
+    elif read_type == "xlsx":
+        return Xlsx.parse(file_path, **kwargs)
     return
 
 
+def open_workbook(file_path, read_type="excel"):
+    """workbook session of reader backend `read_type`, pass it to `parse` as
+    `book` to share one opened file across sheets
+    """
+    if read_type == "xlsx":
+        return XlsxWorkbook(file_path)
+    return Workbook(file_path)
+
+
+def sheet_tables(file_path):
+    """name of each worksheet and of the table it defines, only rows up to
+    the 表名 row are read, the table is "" if the sheet is not a template
+    """
+    read_type = "xlsx" if zipfile.is_zipfile(file_object(file_path)) else "excel"
+    ret = list()
+    with open_workbook(file_path, read_type) as book:
+        for index, sheet_name in enumerate(book.sheet_names):
+            table_name = ""
+            rows = book.rows(index)
+            try:
+                for row in rows:
+                    if not len(row):
+                        continue
+                    kind = _Scanner.kind(row[0])
+                    if kind == TABLE_NAME:
+                        table_name = _Scanner._value(row)
+                        break
+                    elif kind in (HEADER_ROW, SEQ_ROW):
+                        break
+            finally:
+                rows.close()
+            ret.append((sheet_name, str(table_name)))
+    return ret
+
+
 def _convert_key(key):
     if not key:
         return
@@ -87,53 +165,310 @@ def _convert(field):
     return ret
 
 
+class _XlsxBook:
+    """.xlsx workbook which loads worksheets on demand
+
+    xlrd 1.2.0 does not implement `on_demand` for .xlsx and parses every
+    worksheet while opening the file, here only workbook structure and shared
+    strings are loaded up front, worksheet XML is parsed when asked for.
+    """
+
+    def __init__(self, file_path, zf, component_names):
+        xlsx.ensure_elementtree_imported(0, None)
+        self.file_path = file_path
+        self.zf = zf
+        self.component_names = component_names
+        self.book = bk = xlrd.Book()
+        bk.logfile = None
+        bk.verbosity = 0
+        bk.formatting_info = False
+        bk.use_mmap = False
+        bk.on_demand = True
+        bk.ragged_rows = False
+
+        self.x12book = xlsx.X12Book(bk, None, 0)
+        with zf.open(component_names["xl/_rels/workbook.xml.rels"]) as stream:
+            self.x12book.process_rels(stream)
+        with zf.open(component_names["xl/workbook.xml"]) as stream:
+            self.x12book.process_stream(stream, "Workbook")
+        if "xl/styles.xml" in component_names:
+            with zf.open(component_names["xl/styles.xml"]) as stream:
+                xlsx.X12Styles(bk, None, 0).process_stream(stream, "styles")
+        if "xl/sharedstrings.xml" in component_names:
+            with zf.open(component_names["xl/sharedstrings.xml"]) as stream:
+                xlsx.X12SST(bk, None, 0).process_stream(stream, "SST")
+
+    @classmethod
+    def open(cls, file_path):
+        """open file as on demand .xlsx workbook, return None if it is not one"""
+        file_path = file_object(file_path)
+        if not zipfile.is_zipfile(file_path):
+            return
+        zf = zipfile.ZipFile(file_path)
+        component_names = {
+            xlsx.X12Book.convert_filename(name): name for name in zf.namelist()
+        }
+        if "xl/workbook.xml" not in component_names:
+            zf.close()
+            return
+        return cls(file_path, zf, component_names)
+
+    @property
+    def nsheets(self):
+        return self.book.nsheets
+
+    def sheet_names(self):
+        return self.book.sheet_names()
+
+    def load_sheet(self, index):
+        target = self.x12book.sheet_targets[index]
+        name = self.book._sheet_names[index]
+        sheet = Sheet(self.book, position=None, name=name, number=index)
+        sheet.utter_max_rows = xlsx.X12_MAX_ROWS
+        sheet.utter_max_cols = xlsx.X12_MAX_COLS
+        with self.zf.open(self.component_names[target]) as stream:
+            xlsx.X12Sheet(sheet, None, 0).process_stream(
+                stream, f"Sheet {name!r} (sheetx={index}) from {target!r}"
+            )
+        sheet.tidy_dimensions()
+        return sheet
+
+    def release_resources(self):
+        self.book.release_resources()
+        self.zf.close()
+
+
+class Workbook:
+    """Excel workbook session, open the file once and share it across sheets,
+    the file is opened on first use
+
+    usage:
+        with Workbook(file_path) as book:
+            for index in sheets:
+                template = book.parse(index)
+    """
+
+    read_type = "excel"
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._book = None
+        self._xlsx = None
+        self._sheets = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"Workbook(file_path={source_name(self.file_path)!r})"
+
+    def open(self):
+        """open workbook structure only, worksheets are loaded on demand"""
+        if self._book is None:
+            with timing.span("parse.open"):
+                self._xlsx = _XlsxBook.open(self.file_path)
+                if self._xlsx is not None:
+                    self._book = self._xlsx.book
+                else:
+                    self._book = self._open_xls()
+            logger.debug("The number of worksheets is {0}".format(self.nsheets))
+            logger.debug("Worksheet name(s): {0}".format(self.sheet_names))
+        return self
+
+    def _open_xls(self):
+        if not is_in_memory(self.file_path):
+            return xlrd.open_workbook(self.file_path, on_demand=True)
+        contents = self.file_path
+        if hasattr(contents, "read") and not isinstance(contents, mmap.mmap):
+            contents.seek(0)
+            contents = contents.read()
+        return xlrd.open_workbook(file_contents=contents, on_demand=True)
+
+    def close(self):
+        if self._book is not None:
+            if self._xlsx is not None:
+                self._xlsx.release_resources()
+            else:
+                self._book.release_resources()
+            self._book = None
+            self._xlsx = None
+            self._sheets.clear()
+
+    @property
+    def book(self):
+        return self.open()._book
+
+    @property
+    def nsheets(self):
+        return self.book.nsheets
+
+    @property
+    def sheet_names(self):
+        return self.book.sheet_names()
+
+    def sheet(self, index=0):
+        """load worksheet if not loaded yet"""
+        self.open()
+        if self._xlsx is None:
+            with timing.span("parse.load"):
+                return self._book.sheet_by_index(index)
+        if index not in self._sheets:
+            with timing.span("parse.load"):
+                self._sheets[index] = self._xlsx.load_sheet(index)
+        return self._sheets[index]
+
+    def unload(self, index=0):
+        """release memory of a loaded worksheet"""
+        if self._book is None:
+            return
+        if self._xlsx is not None:
+            self._sheets.pop(index, None)
+        elif 0 <= index < self._book.nsheets and self._book.sheet_loaded(index):
+            self._book.unload_sheet(index)
+
+    def rows(self, index=0):
+        return Excel.iter_rows(self, index)
+
+    def parse(self, index=0):
+        return parse(self.file_path, read_type=self.read_type, index=index, book=self)
+
+
+class _SheetRow:
+    """row of xlrd worksheet, cell values are read on access"""
+
+    __slots__ = ("sheet", "rowx")
+
+    def __init__(self, sheet, rowx):
+        self.sheet = sheet
+        self.rowx = rowx
+
+    def __len__(self):
+        return self.sheet.row_len(self.rowx)
+
+    def __iter__(self):
+        return iter(self.sheet.row_values(self.rowx))
+
+    def __getitem__(self, colx):
+        if colx < self.sheet.row_len(self.rowx):
+            return self.sheet.cell_value(self.rowx, colx)
+        return ""
+
+
+class _Scanner:
+    """single pass scanner of worksheet rows
+
+    Rows are dispatched by the kind of their first cell, only the columns
+    mapped by the header are read from field rows, and scanning stops at the
+    first row of notes below the fields, one whose first cell is neither
+    blank nor a number. Numbered rows above the header, and numbers out of
+    sequence, such as duplicated or skipped ones, are not fields.
+    """
+
+    def __init__(self, on_header=None):
+        self.on_header = on_header
+        self.db_name = ""
+        self.table_name = ""
+        self.table_name_zh = ""
+        self.header = dict()
+        self.fields = list()
+        self.seq = 1
+        self.dispatch = {
+            DB_NAME: self._db_name,
+            TABLE_NAME: self._table_name,
+            TABLE_NAME_ZH: self._table_name_zh,
+            HEADER_ROW: self._header,
+            SEQ_ROW: self._seq,
+        }
+
+    @staticmethod
+    def kind(first):
+        if isinstance(first, str):
+            kind = ROW_KINDS.get(first) or ROW_KINDS.get(first.lower())
+            if kind is None and first.isdigit():
+                return SEQ_ROW
+            return kind
+        elif isinstance(first, (float, int)):
+            return SEQ_ROW
+        return
+
+    def scan(self, rows):
+        for row in rows:
+            if not len(row):
+                continue
+            first = row[0]
+            handler = self.dispatch.get(self.kind(first))
+            if handler is not None:
+                handler(row)
+            elif self.fields and first != "":
+                # end of fields, the rest are notes of the sheet
+                break
+        return self
+
+    @staticmethod
+    def _value(row):
+        return row[1] if len(row) > 1 else ""
+
+    def _db_name(self, row):
+        self.db_name = self._value(row)
+
+    def _table_name(self, row):
+        self.table_name = self._value(row)
+
+    def _table_name_zh(self, row):
+        self.table_name_zh = self._value(row)
+
+    def _header(self, row):
+        header = Excel._convert_header(list(row))
+        fields = set(HEADER.values())
+        self.header = {i: _.title() for i, _ in enumerate(header) if _ in fields}
+        if self.on_header is not None:
+            # label rows such as 库名 use the first two columns
+            self.on_header({0, 1} | set(self.header))
+
+    def _seq(self, row):
+        if not self.header or int(row[0]) != self.seq:
+            return
+        self.fields.append({name: row[i] for i, name in self.header.items()})
+        self.seq += 1
+
+
 class Excel:
     @staticmethod
-    def read(file_path, index=0):
+    def read(file_path, index=0, book=None):
         """read MS Excel and return dicts form of generator
         @param: xls_file: name of excel file
         @param: index: index of Excel worksheets
+        @param: book: opened `Workbook` session, reuse it instead of reopening file
         """
 
-        book = xlrd.open_workbook(file_path)
-        logger.debug("The number of worksheets is {0}".format(book.nsheets))
-        logger.debug("Worksheet name(s): {0}".format(book.sheet_names()))
+        if book is None:
+            with Workbook(file_path) as book:
+                return Excel.read(file_path, index, book=book)
 
-        sheet = book.sheet_by_index(index)
-        logger.debug(
-            "{0} rows: {1} columns: {2}\n".format(sheet.name, sheet.nrows, sheet.ncols)
-        )
-
-        rows = [sheet.row_values(rx) for rx in range(sheet.nrows)]
+        rows = [list(row) for row in Excel.iter_rows(book, index)]
         return rows
 
     @staticmethod
-    def _is_seq(seq):
-        if isinstance(seq, (float, int)):
-            return True
-        elif isinstance(seq, str) and seq.isdigit():
-            return True
-        return False
-
-    @staticmethod
-    def _is_header(word):
-        if isinstance(word, str):
-            if word == "序号" or word.lower() == "seq":
-                return True
-        return False
+    def iter_rows(book, index=0):
+        """yield rows of worksheet, cells are read on access, worksheet is
+        unloaded once the rows are done with
+        """
+        sheet = book.sheet(index)
+        logger.debug(
+            "{0} rows: {1} columns: {2}\n".format(sheet.name, sheet.nrows, sheet.ncols)
+        )
+        try:
+            for rx in range(sheet.nrows):
+                yield _SheetRow(sheet, rx)
+        finally:
+            book.unload(index)
 
     @staticmethod
     def _convert_header(row):
-        header = {
-            "字段名称": "Field",
-            "字段中文名": "Comment",
-            "字段类型": "Type",
-            "字段长度": "Length",
-            "能否为空": "Null",
-            "默认值": "Default",
-            "字段属性": "Key",
-            "附加属性": "Extra",
-        }
+        header = HEADER
         if len(set(row) & set(header.values())) == len(header):
             return row
         elif len(set(row) & set(header.keys())) == len(header):
@@ -142,42 +477,60 @@ class Excel:
             raise InValidTemplate(f"Invalid template header: {row}")
 
     @staticmethod
-    def parse(file_path, index=0):
-        rows = Excel.read(file_path, index)
-        db_name = ""
-        table_name = ""
-        table_name_zh = ""
-        header = list()
-        values = list()
-        seq = 1
-        for row in rows:
-            if row[0] == "库名":
-                db_name = row[1]
-            elif row[0] == "表名":
-                table_name = row[1]
-            elif row[0] == "表中文名":
-                table_name_zh = row[1]
-            elif Excel._is_header(row[0]):
-                header = Excel._convert_header(row)
-            elif Excel._is_seq(row[0]):
-                if int(row[0]) == seq:
-                    values.append(row)
-                    seq += 1
-
-        header = [_.title() for _ in header]
-        fields = [_convert(dict(zip(header, val))) for val in values]
-        if not table_name or not header or not fields:
-            raise InValidTemplate(f"Invalid template, please check file: {file_path}")
+    def parse(file_path, index=0, book=None):
+        if book is None:
+            with Workbook(file_path) as book:
+                return Excel.parse(file_path, index, book=book)
+
+        rows = Excel.iter_rows(book, index)
+        try:
+            return Excel.from_rows(rows, file_path)
+        finally:
+            rows.close()
+
+    @staticmethod
+    def from_rows(rows, file_path, on_header=None):
+        """build template from rows of worksheet
+        @param: rows: iterable of row values
+        @param: file_path: name of excel file, for error messages
+        @param: on_header: callback with indexes of columns still needed, once
+            the header is found
+        """
+        with timing.span("parse.scan"):
+            scanner = _Scanner(on_header).scan(rows)
+        with timing.span("parse.convert"):
+            fields = [_convert(_) for _ in scanner.fields]
+        table_name = scanner.table_name
+        if not table_name or not scanner.header or not fields:
+            raise InValidTemplate(
+                f"Invalid template, please check file: {source_name(file_path)}"
+            )
 
         logger.debug(
-            f"Database: {db_name}\tTable: {table_name}\tFields: {[x['Name'] for x in fields]}"
+            f"Database: {scanner.db_name}\tTable: {table_name}\tFields: {[x['Name'] for x in fields]}"
         )
         template = dict()
         template["Table"] = table_name
-        template["Table_zh"] = table_name_zh
+        template["Table_zh"] = scanner.table_name_zh
         template["Fields"] = fields
         # template["ENGINE"] = ""
         # template["AUTO_INCREMENT"] = ""
         # template["CHARSET"] = ""
         # template["ROW_FORMAT"] = ""
         return template
+
+
+class Xlsx:
+    """.xlsx reader backend streaming worksheet XML with standard library only"""
+
+    @staticmethod
+    def parse(file_path, index=0, book=None):
+        if book is None:
+            with XlsxWorkbook(file_path) as book:
+                return Xlsx.parse(file_path, index, book=book)
+
+        rows = book.rows(index)
+        try:
+            return Excel.from_rows(rows, file_path, on_header=rows.project)
+        finally:
+            rows.close()
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Render `ddlgenerator.Table` into CREATE TABLE statement
+
+Statements are written into a text stream as a few fragments, layout text is
+fixed per style and column clauses are rendered once on the immutable fields.
+
+Styles:
+    compat      byte-identical to the output of sqlgen so far, blank padding
+                of empty parts included
+    pretty      one column or key per line, no blank padding
+    compact     whole statement on one line
+
+usage:
+    render.write(table, sys.stdout, style="pretty")
+    sql = render.render(table)
+"""
+import io
+
+STYLES = ("compat", "pretty", "compact")
+
+# compat layout, of the former f-string template
+_COMPAT_HEAD = "\nCREATE TABLE \n    IF NOT EXISTS `"
+_COMPAT_COLUMNS = "`\n    (\n      \t\t"
+_COMPAT_COLUMN_SEP = "\n\t\t, "
+_COMPAT_KEYS = "\n      \t, "
+_COMPAT_KEY_SEP = "\n\t, "
+_COMPAT_OPTIONS = "\n    )\n    "
+_COMPAT_END = "\n;\n"
+
+
+class _Layout:
+    """fragments of statement without padding, columns and keys are items
+    separated alike
+    """
+
+    __slots__ = ("head", "columns", "sep", "close", "end")
+
+    def __init__(self, head, columns, sep, close, end):
+        self.head = head
+        self.columns = columns
+        self.sep = sep
+        self.close = close
+        self.end = end
+
+
+_LAYOUTS = {
+    "pretty": _Layout(
+        "CREATE TABLE IF NOT EXISTS `", "` (\n    ", ",\n    ", "\n)", ";\n"
+    ),
+    "compact": _Layout("CREATE TABLE IF NOT EXISTS `", "` (", ", ", ")", ";"),
+}
+
+
+def _write_compat(table, stream):
+    write = stream.write
+    write(_COMPAT_HEAD)
+    write(table.name)
+    write(_COMPAT_COLUMNS)
+    if table.columns:
+        write(_COMPAT_COLUMN_SEP.join([c.clause() for c in table.columns]))
+        write("\n")
+    write(_COMPAT_KEYS)
+    keys = table.keys()
+    if keys:
+        write(_COMPAT_KEY_SEP.join(keys))
+        write("\n")
+    write(_COMPAT_OPTIONS)
+    write(" ".join(table.options()))
+    write(_COMPAT_END)
+
+
+def _write_layout(table, stream, layout):
+    write = stream.write
+    write(layout.head)
+    write(table.name)
+    write(layout.columns)
+    items = [c.clause(padded=False) for c in table.columns]
+    items.extend(table.keys())
+    write(layout.sep.join(items))
+    write(layout.close)
+    options = " ".join(filter(None, table.options()))
+    if options:
+        write(" ")
+        write(options)
+    write(layout.end)
+
+
+def write(table, stream, style="compat"):
+    """write CREATE TABLE statement of `table` into text `stream`"""
+    if style == "compat":
+        return _write_compat(table, stream)
+    try:
+        layout = _LAYOUTS[style]
+    except KeyError:
+        raise ValueError(f"Invalid style {style!r}, expect one of {STYLES}")
+    _write_layout(table, stream, layout)
+
+
+def render(table, style="compat"):
+    """CREATE TABLE statement of `table` as str"""
+    stream = io.StringIO()
+    write(table, stream, style)
+    return stream.getvalue()
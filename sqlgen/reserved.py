@@ -4,12 +4,12 @@
 Keywords reserved in MySQL standard
 
 From https://dev.mysql.com/doc/refman/5.7/en/keywords.html
+
+Lookups are compiled from these lists in `sqlgen.catalog`.
 """
-import re
 
 sql_reserved_words = [
     "ACCESSIBLE",
-    "ACCOUNT;",
     "ACCOUNT",
     "ACTION",
     "ADD",
@@ -19,7 +19,6 @@ sql_reserved_words = [
     "ALGORITHM",
     "ALL",
     "ALTER",
-    "ALWAYS;",
     "ALWAYS",
     "ANALYSE",
     "ANALYZE",
@@ -59,7 +58,6 @@ sql_reserved_words = [
     "CHAIN",
     "CHANGE",
     "CHANGED",
-    "CHANNEL;",
     "CHANNEL",
     "CHAR",
     "CHARACTER",
@@ -84,7 +82,6 @@ sql_reserved_words = [
     "COMPACT",
     "COMPLETION",
     "COMPRESSED",
-    "COMPRESSION;",
     "COMPRESSION",
     "CONCURRENT",
     "CONDITION",
@@ -154,7 +151,6 @@ sql_reserved_words = [
     "ELSEIF",
     "ENABLE",
     "ENCLOSED",
-    "ENCRYPTION;",
     "ENCRYPTION",
     "END",
     "ENDS",
@@ -184,9 +180,7 @@ sql_reserved_words = [
     "FETCH",
     "FIELDS",
     "FILE",
-    "FILE_BLOCK_SIZE;",
     "FILE_BLOCK_SIZE",
-    "FILTER;",
     "FILTER",
     "FIRST",
     "FIXED",
@@ -194,7 +188,6 @@ sql_reserved_words = [
     "FLOAT4",
     "FLOAT8",
     "FLUSH",
-    "FOLLOWS;",
     "FOLLOWS",
     "FOR",
     "FORCE",
@@ -207,7 +200,6 @@ sql_reserved_words = [
     "FUNCTION",
     "GENERAL",
     "GENERATED",
-    "GENERATED",
     "GEOMETRY",
     "GEOMETRYCOLLECTION",
     "GET",
@@ -216,7 +208,6 @@ sql_reserved_words = [
     "GRANT",
     "GRANTS",
     "GROUP",
-    "GROUP_REPLICATION;",
     "GROUP_REPLICATION",
     "HANDLER",
     "HASH",
@@ -245,7 +236,6 @@ sql_reserved_words = [
     "INSERT",
     "INSERT_METHOD",
     "INSTALL",
-    "INSTANCE;",
     "INSTANCE",
     "INT",
     "INT1",
@@ -267,7 +257,6 @@ sql_reserved_words = [
     "ISSUER",
     "ITERATE",
     "JOIN",
-    "JSON;",
     "JSON",
     "KEY",
     "KEY_BLOCK_SIZE",
@@ -322,7 +311,6 @@ sql_reserved_words = [
     "MASTER_SSL_CRLPATH",
     "MASTER_SSL_KEY",
     "MASTER_SSL_VERIFY_SERVER_CERT",
-    "MASTER_TLS_VERSION;",
     "MASTER_TLS_VERSION",
     "MASTER_USER",
     "MATCH",
@@ -330,7 +318,7 @@ sql_reserved_words = [
     "MAX_QUERIES_PER_HOUR",
     "MAX_ROWS",
     "MAX_SIZE",
-    "MAX_STATEMENT_TIME;",
+    "MAX_STATEMENT_TIME",
     "MAX_UPDATES_PER_HOUR",
     "MAX_USER_CONNECTIONS",
     "MAXVALUE",
@@ -365,13 +353,12 @@ sql_reserved_words = [
     "NCHAR",
     "NDB",
     "NDBCLUSTER",
-    "NEVER;",
     "NEVER",
     "NEW",
     "NEXT",
     "NO",
     "NODEGROUP",
-    "NONBLOCKING;",
+    "NONBLOCKING",
     "NONE",
     "NOT",
     "NO_WAIT",
@@ -381,14 +368,13 @@ sql_reserved_words = [
     "NUMERIC",
     "NVARCHAR",
     "OFFSET",
-    "OLD_PASSWORD;",
+    "OLD_PASSWORD",
     "ON",
     "ONE",
     "ONLY",
     "OPEN",
     "OPTIMIZE",
     "OPTIMIZER_COSTS",
-    "OPTIMIZER_COSTS",
     "OPTION",
     "OPTIONALLY",
     "OPTIONS",
@@ -400,7 +386,6 @@ sql_reserved_words = [
     "OWNER",
     "PACK_KEYS",
     "PAGE",
-    "PARSE_GCOL_EXPR;",
     "PARSE_GCOL_EXPR",
     "PARSER",
     "PARTIAL",
@@ -415,7 +400,6 @@ sql_reserved_words = [
     "POINT",
     "POLYGON",
     "PORT",
-    "PRECEDES;",
     "PRECEDES",
     "PRECISION",
     "PREPARE",
@@ -459,19 +443,12 @@ sql_reserved_words = [
     "REPEAT",
     "REPEATABLE",
     "REPLACE",
-    "REPLICATE_DO_DB;",
     "REPLICATE_DO_DB",
-    "REPLICATE_DO_TABLE;",
     "REPLICATE_DO_TABLE",
-    "REPLICATE_IGNORE_DB;",
     "REPLICATE_IGNORE_DB",
-    "REPLICATE_IGNORE_TABLE;",
     "REPLICATE_IGNORE_TABLE",
-    "REPLICATE_REWRITE_DB;",
     "REPLICATE_REWRITE_DB",
-    "REPLICATE_WILD_DO_TABLE;",
     "REPLICATE_WILD_DO_TABLE",
-    "REPLICATE_WILD_IGNORE_TABLE;",
     "REPLICATE_WILD_IGNORE_TABLE",
     "REPLICATION",
     "REQUIRE",
@@ -489,7 +466,6 @@ sql_reserved_words = [
     "RLIKE",
     "ROLLBACK",
     "ROLLUP",
-    "ROTATE;",
     "ROTATE",
     "ROUTINE",
     "ROW",
@@ -554,7 +530,6 @@ sql_reserved_words = [
     "SQLWARNING",
     "SSL",
     "STACKED",
-    "STACKED",
     "START",
     "STARTING",
     "STARTS",
@@ -565,7 +540,6 @@ sql_reserved_words = [
     "STOP",
     "STORAGE",
     "STORED",
-    "STORED",
     "STRAIGHT_JOIN",
     "STRING",
     "SUBCLASS_ORIGIN",
@@ -627,7 +601,6 @@ sql_reserved_words = [
     "UTC_DATE",
     "UTC_TIME",
     "UTC_TIMESTAMP",
-    "VALIDATION;",
     "VALIDATION",
     "VALUE",
     "VALUES",
@@ -638,7 +611,6 @@ sql_reserved_words = [
     "VARYING",
     "VIEW",
     "VIRTUAL",
-    "VIRTUAL",
     "WAIT",
     "WARNINGS",
     "WEEK",
@@ -647,33 +619,20 @@ sql_reserved_words = [
     "WHERE",
     "WHILE",
     "WITH",
-    "WITHOUT;",
     "WITHOUT",
     "WORK",
     "WRAPPER",
     "WRITE",
     "X509",
     "XA",
-    "XID;",
-    "XID" "XML",
+    "XID",
+    "XML",
     "XOR",
     "YEAR",
     "YEAR_MONTH",
     "ZEROFILL",
 ]
 
-_sql_reserved_words_set = set(sql_reserved_words)
-
-
-def is_reserved_words(words):
-    if isinstance(words, (list, tuple)):
-        words = set(_ for w in words for _ in re.split(r"\s+", w))
-        return words.issubset(_sql_reserved_words_set)
-    elif isinstance(words, str):
-        return set(re.split(r"\s+", words)).issubset(_sql_reserved_words_set)
-    return False
-
-
 NUMERIC = [
     "INTEGER",
     "INT",
@@ -693,3 +652,6 @@ DATE_AND_TIME = ["DATE", "DATETIME", "TIMESTAMP", "TIME", "YEAR"]
 STRING = ["CHAR", "VARCHAR", "BINARY", "VARBINARY", "BLOB", "TEXT", "ENUM", "SET"]
 
 DEFAULT_EMPTY_STRING = ["CHAR", "VARCHAR"]
+
+# is_reserved_words lived here before the catalog, still importable from here
+from sqlgen.catalog import is_reserved_words  # noqa: E402,F401
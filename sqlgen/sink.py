@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Sinks of generated DDL, stdout, plain or gzipped files
+
+DDL of each table is written and flushed as soon as it is rendered, instead
+of joining the whole output first, so `sqlgen ... | mysql` starts executing
+while later sheets are still being parsed. Gzip output is flushed per table
+too, readers can decompress it as it is written.
+
+usage:
+    with open_sink("ddl.sql.gz") as sink:
+        for clause in parallel.generate(file_path, sheets):
+            sink.write(clause)
+"""
+import gzip
+import io
+import sys
+
+
+class Sink:
+    """DDL of tables written into text `stream`, separated by `sep`, `end` is
+    written once on close if any table was written
+    """
+
+    def __init__(self, stream, sep="\n", end="", close_stream=True):
+        self.stream = stream
+        self.sep = sep
+        self.end = end
+        self.close_stream = close_stream
+        self.tables = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"Sink("
+            f"stream={getattr(self.stream, 'name', self.stream)!r},"
+            f"tables={self.tables!r}"
+            f")"
+        )
+
+    def write(self, clause):
+        """write DDL of one table"""
+        if self.tables:
+            self.stream.write(self.sep)
+        self.stream.write(clause)
+        self.stream.flush()
+        self.tables += 1
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.tables:
+            self.stream.write(self.end)
+        if self.close_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+def stdout_sink(compress=False):
+    """sink of stdout, ends with a newline as `print` does"""
+    if not compress:
+        return Sink(sys.stdout, end="\n", close_stream=False)
+    # closing the gzip stream writes its trailer, stdout itself stays open
+    stream = gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb")
+    return Sink(io.TextIOWrapper(stream, encoding="utf8"), end="\n")
+
+
+def file_sink(path, compress=None, end=""):
+    """sink of file `path`, gzipped if `compress`, or if None and the name
+    ends with .gz
+    """
+    if compress is None:
+        compress = str(path).endswith(".gz")
+    if compress:
+        return Sink(gzip.open(path, "wt", encoding="utf8"), end=end)
+    return Sink(open(path, "w"), end=end)
+
+
+def open_sink(path=None, compress=None, end=""):
+    """sink of file `path`, stdout if None or '-'"""
+    if path is None or str(path) == "-":
+        return stdout_sink(bool(compress))
+    return file_sink(path, compress, end)
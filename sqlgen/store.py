@@ -0,0 +1,460 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Content addressed document store of the web UI
+
+Documents are saved once per distinct content under their sha256 digest, and
+a JSON index keeps name(s), size, upload time, sheet names and table names of
+each document, so that listing documents never touches the workbooks. A
+background sweeper keeps the store within size, count and age limits, its
+recent evictions and totals are kept next to the index, shared by all server
+processes.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlgen import reader
+from sqlgen.cache import file_hash
+from sqlgen.exceptions import UploadTooLarge
+from sqlgen.filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+# recent evictions kept in the sweep log
+EVICTION_LOG_SIZE = 50
+
+
+def _atomic_write(path, data):
+    """write then rename, readers never see a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class _JSONFile:
+    """JSON document on disk, re-read only when the file changed, by any
+    process, written atomically
+    """
+
+    def __init__(self, path, default):
+        self.path = path
+        self.default = default
+        self._value = None
+        self._version = None
+
+    def __repr__(self):
+        return f"_JSONFile(path={str(self.path)!r})"
+
+    def _stat(self):
+        # file is replaced on write, a new inode tells writes apart even
+        # within the resolution of modified time
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def read(self):
+        version = self._stat()
+        if self._value is None or version != self._version:
+            if version is None:
+                self._value = self.default()
+            else:
+                with open(self.path, encoding="utf8") as f:
+                    self._value = json.load(f)
+            self._version = version
+        return self._value
+
+    def write(self, value):
+        data = json.dumps(value, ensure_ascii=False, indent=2).encode("utf8")
+        _atomic_write(self.path, data)
+        self._value = value
+        self._version = self._stat()
+
+
+def _no_sweeps():
+    return {"evicted_count": 0, "evicted_bytes": 0, "last_sweep": None, "evictions": []}
+
+
+class DocumentStore:
+    """documents by content digest, with a metadata index
+
+    layout:
+        <root>/objects/<digest>.xlsx
+        <root>/index.json
+        <root>/sweeps.json      recent evictions and totals
+    """
+
+    suffix = ".xlsx"
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects = self.root.joinpath("objects")
+        self.index_path = self.root.joinpath("index.json")
+        self.sweeps_path = self.root.joinpath("sweeps.json")
+        self.objects.mkdir(parents=True, exist_ok=True)
+        # shared by server processes, updates of index and sweep log are
+        # read-modify-write
+        self._lock = FileLock(self.root.joinpath(".lock"))
+        self._index = _JSONFile(self.index_path, dict)
+        # eviction activity, reported on the documents page
+        self._sweeps = _JSONFile(self.sweeps_path, _no_sweeps)
+        self.import_legacy()
+
+    def __repr__(self):
+        return f"DocumentStore(root={str(self.root)!r})"
+
+    def __len__(self):
+        return len(self._read_index())
+
+    def _read_index(self):
+        """index, re-read only when the file changed, by any process"""
+        return self._index.read()
+
+    def _write_index(self, index):
+        self._index.write(index)
+
+    @property
+    def evictions(self):
+        """recent evictions of every process, most recent first"""
+        return self._sweeps.read()["evictions"]
+
+    @property
+    def evicted_count(self):
+        return self._sweeps.read()["evicted_count"]
+
+    @property
+    def evicted_bytes(self):
+        return self._sweeps.read()["evicted_bytes"]
+
+    @property
+    def last_sweep(self):
+        return self._sweeps.read()["last_sweep"]
+
+    def path(self, digest):
+        return self.objects.joinpath(digest + self.suffix)
+
+    def get(self, digest):
+        return self._read_index().get(digest)
+
+    def list(self):
+        """documents, most recently uploaded first"""
+        docs = self._read_index().values()
+        return sorted(docs, key=lambda _: _["uploaded"], reverse=True)
+
+    def add(self, name, content):
+        """save document content, an identical document is stored only once
+        @param: name: file name of upload
+        @param: content: bytes of file
+        @return: document metadata
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.objects, prefix="add-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            return self.add_file(name, tmp, hashlib.sha256(content).hexdigest())
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+    def add_file(self, name, file_path, digest=None):
+        """save document from file on disk, the file is moved into the store
+        @param: digest: sha256 of file content if already known
+        """
+        file_path = Path(file_path)
+        digest = digest or file_hash(file_path)
+        path = self.path(digest)
+        # workbooks are read before taking the lock shared by every server
+        # process, it is held only to move the file and rewrite the index
+        sheets = None
+        if self.get(digest) is None:
+            sheets = self._read_sheets(name, file_path)
+        with self._lock:
+            if path.exists():
+                file_path.unlink()
+            else:
+                os.replace(file_path, path)
+            return self._register(digest, name, path.stat().st_size, sheets)
+
+    def upload(self, name, max_bytes=0):
+        """save document written chunk by chunk, see `Upload`"""
+        return Upload(self, name, max_bytes)
+
+    @staticmethod
+    def _read_sheets(name, source):
+        """(sheet names, table names) of workbook, empty if it can not be read"""
+        try:
+            sheet_tables = reader.sheet_tables(source)
+        except Exception as e:
+            logger.warning(f"Failed to read sheets of {name}: {e}")
+            return list(), list()
+        return [sheet for sheet, _ in sheet_tables], [
+            table for _, table in sheet_tables
+        ]
+
+    def _register(self, digest, name, size, sheets=None):
+        index = dict(self._read_index())
+        doc = index.get(digest)
+        if doc is None:
+            if sheets is None:
+                # removed by another process since it was looked up, rare
+                sheets = self._read_sheets(name, self.path(digest))
+            now = time.time()
+            doc = {
+                "digest": digest,
+                "name": name,
+                "names": [name],
+                "size": size,
+                "uploaded": now,
+                "last_used": now,
+                "sheets": sheets[0],
+                "tables": sheets[1],
+            }
+        else:
+            now = time.time()
+            doc = dict(doc, name=name, uploaded=now, last_used=now)
+            if name not in doc["names"]:
+                doc["names"] = doc["names"] + [name]
+        index[digest] = doc
+        self._write_index(index)
+        return doc
+
+    def touch(self, digest):
+        """mark document as used now, eviction goes least recently used first"""
+        with self._lock:
+            index = dict(self._read_index())
+            if digest in index:
+                index[digest] = dict(index[digest], last_used=time.time())
+                self._write_index(index)
+
+    @staticmethod
+    def last_used(doc):
+        return doc.get("last_used", doc["uploaded"])
+
+    def size(self):
+        """total bytes of documents"""
+        return sum(_["size"] for _ in self._read_index().values())
+
+    def sweep(self, max_bytes=0, max_files=0, max_age=0):
+        """evict documents unused for over `max_age` seconds, then least
+        recently used ones until there are at most `max_files` documents of
+        at most `max_bytes` in total, 0 means no limit
+        @return: evicted documents
+        """
+        evicted = list()
+        evictions = list()
+        with self._lock:
+            index = dict(self._read_index())
+            now = time.time()
+            total = sum(_["size"] for _ in index.values())
+            count = len(index)
+            for doc in sorted(index.values(), key=self.last_used):
+                if max_age and now - self.last_used(doc) > max_age:
+                    reason = "age"
+                elif max_files and count > max_files:
+                    reason = "count"
+                elif max_bytes and total > max_bytes:
+                    reason = "size"
+                else:
+                    break
+                del index[doc["digest"]]
+                self.path(doc["digest"]).unlink(missing_ok=True)
+                total -= doc["size"]
+                count -= 1
+                evicted.append(doc)
+                evictions.insert(
+                    0,
+                    {
+                        "time": now,
+                        "name": doc["name"],
+                        "size": doc["size"],
+                        "reason": reason,
+                    },
+                )
+            if evicted:
+                self._write_index(index)
+            self._remove_orphans(index, now)
+
+            # totals of every process, written under the same lock as index
+            sweeps = dict(self._sweeps.read(), last_sweep=time.time())
+            sweeps["evicted_count"] += len(evicted)
+            sweeps["evicted_bytes"] += sum(_["size"] for _ in evicted)
+            evictions.extend(sweeps["evictions"])
+            sweeps["evictions"] = evictions[:EVICTION_LOG_SIZE]
+            self._sweeps.write(sweeps)
+
+        for doc in evicted:
+            logger.info(f"Evicted document {doc['name']} ({doc['digest']})")
+        return evicted
+
+    def _remove_orphans(self, index, now, grace=3600):
+        # objects missing from index, or temporary files of interrupted writes
+        for path in self.objects.iterdir():
+            digest = path.name[: -len(self.suffix)]
+            if path.suffix == self.suffix and digest in index:
+                continue
+            try:
+                if now - path.stat().st_mtime > grace:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def remove(self, digest):
+        """delete document, return its metadata or None if it does not exist"""
+        with self._lock:
+            index = dict(self._read_index())
+            doc = index.pop(digest, None)
+            self.path(digest).unlink(missing_ok=True)
+            if doc is not None:
+                self._write_index(index)
+            return doc
+
+    def import_legacy(self):
+        """move documents saved as <root>/<filename>.xlsx into the store"""
+        for file in sorted(self.root.glob("*" + self.suffix)):
+            logger.info(f"Import document {file.name} into store")
+            self.add_file(file.name, file)
+
+
+class Upload:
+    """document written into store chunk by chunk, content is hashed while
+    being written so it is never held in memory nor read twice
+
+    usage:
+        with store.upload(name, max_bytes) as upload:
+            for chunk in chunks:
+                upload.write(chunk)
+        doc = upload.doc
+    """
+
+    def __init__(self, store, name, max_bytes=0):
+        self.store = store
+        self.name = name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.doc = None
+        self._hash = hashlib.sha256()
+        # temporary files of interrupted uploads are swept as orphans
+        fd, self._tmp = tempfile.mkstemp(
+            dir=store.objects, prefix="upload-", suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def __repr__(self):
+        return (
+            f"Upload("
+            f"name={self.name!r},"
+            f"size={self.size!r},"
+            f"max_bytes={self.max_bytes!r}"
+            f")"
+        )
+
+    def write(self, chunk):
+        """append chunk, raise UploadTooLarge as soon as the limit is passed"""
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.abort()
+            raise UploadTooLarge(self.name, self.max_bytes)
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self):
+        """move written file into store
+        @return: document metadata
+        """
+        if self.doc is None:
+            self._file.close()
+            self.doc = self.store.add_file(
+                self.name, self._tmp, digest=self._hash.hexdigest()
+            )
+        return self.doc
+
+    def abort(self):
+        self._file.close()
+        Path(self._tmp).unlink(missing_ok=True)
+
+
+class Sweeper(threading.Thread):
+    """background thread sweeping the store within its limits"""
+
+    def __init__(
+        self,
+        store,
+        interval=300,
+        max_bytes=0,
+        max_files=0,
+        max_age=0,
+        on_evict=None,
+    ):
+        super().__init__(name="sqlgen-sweeper", daemon=True)
+        self.store = store
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_age = max_age
+        self.on_evict = on_evict
+        self._stopped = threading.Event()
+
+    def __repr__(self):
+        return (
+            f"Sweeper("
+            f"interval={self.interval!r},"
+            f"max_bytes={self.max_bytes!r},"
+            f"max_files={self.max_files!r},"
+            f"max_age={self.max_age!r}"
+            f")"
+        )
+
+    @classmethod
+    def from_env(cls, store, on_evict=None):
+        """sweeper configured by SQLGEN_STORE_MAX_BYTES (default 1 GiB),
+        SQLGEN_STORE_MAX_FILES, SQLGEN_STORE_MAX_AGE (seconds) and
+        SQLGEN_SWEEP_INTERVAL (seconds, default 300), 0 means no limit
+        """
+        env = os.environ.get
+        return cls(
+            store,
+            interval=float(env("SQLGEN_SWEEP_INTERVAL") or 300),
+            max_bytes=int(env("SQLGEN_STORE_MAX_BYTES") or 1024**3),
+            max_files=int(env("SQLGEN_STORE_MAX_FILES") or 0),
+            max_age=float(env("SQLGEN_STORE_MAX_AGE") or 0),
+            on_evict=on_evict,
+        )
+
+    def sweep(self):
+        try:
+            evicted = self.store.sweep(self.max_bytes, self.max_files, self.max_age)
+        except Exception:
+            logger.exception("Failed to sweep document store")
+            return list()
+        if self.on_evict is not None:
+            for doc in evicted:
+                self.on_evict(doc)
+        return evicted
+
+    def run(self):
+        self.sweep()
+        while not self._stopped.wait(self.interval):
+            self.sweep()
+
+    def stop(self):
+        self._stopped.set()
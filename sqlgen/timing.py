@@ -0,0 +1,198 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Lightweight timing spans and counters of DDL generation stages
+
+Spans and counts are recorded only inside `record`, elsewhere they cost
+a context variable lookup. The recorder is plain data, so tasks run in
+worker processes send it back along with their result.
+
+Stages, sub-stages are named after their stage:
+    parse           read template of sheet, `reader.parse`
+    parse.open      open workbook, once per workbook session
+    parse.load      load worksheet
+    parse.scan      scan rows for table name, header and fields
+    parse.convert   convert field values, `reader._convert`
+    build           build table of template, `ddlgenerator.parse`
+    build.judge     validate fields, as `Field` is created
+    render          render DDL of table, `Table.clause`
+
+Rows are read lazily, so parse.load of the excel backend is timed inside
+parse.scan, and the xlsx backend streams rows while scanning them.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STAGES = (
+    "parse",
+    "parse.open",
+    "parse.load",
+    "parse.scan",
+    "parse.convert",
+    "build",
+    "build.judge",
+    "render",
+)
+
+_recorder = ContextVar("sqlgen_recorder", default=None)
+_sheet = ContextVar("sqlgen_sheet", default=None)
+
+
+class Recorder:
+    """seconds of each span and value of each counter recorded in a context,
+    and seconds of each span by sheet
+    """
+
+    def __init__(self):
+        self.spans = defaultdict(list)
+        self.counts = defaultdict(int)
+        self.sheets = dict()
+
+    def __repr__(self):
+        spans = {name: len(seconds) for name, seconds in self.spans.items()}
+        counts = dict(self.counts)
+        return f"Recorder(spans={spans!r},counts={counts!r})"
+
+    def add(self, name, seconds, sheet=None):
+        self.spans[name].append(seconds)
+        if sheet is not None:
+            spans = self.sheets.setdefault(sheet, dict())
+            spans[name] = spans.get(name, 0.0) + seconds
+
+    def merge(self, other):
+        for name, seconds in other.spans.items():
+            self.spans[name].extend(seconds)
+        for name, value in other.counts.items():
+            self.counts[name] += value
+        for sheet, spans in other.sheets.items():
+            merged = self.sheets.setdefault(sheet, dict())
+            for name, seconds in spans.items():
+                merged[name] = merged.get(name, 0.0) + seconds
+        return self
+
+    def stage_names(self):
+        """recorded span names, known stages in pipeline order first"""
+        known = [_ for _ in STAGES if _ in self.spans]
+        return known + sorted(set(self.spans) - set(known))
+
+    def summary(self):
+        """aggregated seconds of each stage, per run and per sheet"""
+        stages = dict()
+        for name in self.stage_names():
+            seconds = self.spans[name]
+            stages[name] = {
+                "calls": len(seconds),
+                "total": sum(seconds),
+                "mean": sum(seconds) / len(seconds),
+                "max": max(seconds),
+            }
+        return {
+            "stages": stages,
+            "sheets": {str(k): dict(v) for k, v in self.sheets.items()},
+            "counts": dict(self.counts),
+        }
+
+    def format_table(self):
+        """summary as text tables, of stages, of sheets, then of counters"""
+        header = ("stage", "calls", "total(s)", "mean(ms)", "max(ms)")
+        rows = [
+            (
+                ("  " if "." in name else "") + name,
+                str(stage["calls"]),
+                f"{stage['total']:.4f}",
+                f"{stage['mean'] * 1000:.3f}",
+                f"{stage['max'] * 1000:.3f}",
+            )
+            for name, stage in self.summary()["stages"].items()
+        ]
+        tables = [format_rows(header, rows)]
+
+        # top level stages only, sub-stages are included in them
+        names = [_ for _ in self.stage_names() if "." not in _]
+        if self.sheets:
+            header = ("sheet",) + tuple(f"{_}(s)" for _ in names) + ("total(s)",)
+            rows = [
+                (str(sheet),)
+                + tuple(f"{spans.get(_, 0.0):.4f}" for _ in names)
+                + (f"{sum(spans.get(_, 0.0) for _ in names):.4f}",)
+                for sheet, spans in self.sheets.items()
+            ]
+            tables.append(format_rows(header, rows))
+        if self.counts:
+            rows = [(name, str(value)) for name, value in sorted(self.counts.items())]
+            tables.append(format_rows(("counter", "value"), rows))
+        return "\n\n".join(tables)
+
+
+def format_rows(header, rows):
+    """text table of str cells, columns left aligned to their widest cell"""
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = [
+        "  ".join(col.ljust(w) for col, w in zip(row, widths)).rstrip()
+        for row in [header] + rows
+    ]
+    return "\n".join(lines)
+
+
+def active():
+    """recorder of current context, None if not recording"""
+    return _recorder.get()
+
+
+@contextmanager
+def span(name):
+    """time the block as span `name`"""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, time.perf_counter() - start, _sheet.get())
+
+
+@contextmanager
+def sheet(label):
+    """attribute spans of the block to sheet `label`"""
+    token = _sheet.set(label)
+    try:
+        yield
+    finally:
+        _sheet.reset(token)
+
+
+def count(name, value=1):
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.counts[name] += value
+
+
+def merge(recorder):
+    """merge recorder of a worker into the recorder of current context"""
+    current = _recorder.get()
+    if current is not None and recorder is not None:
+        current.merge(recorder)
+
+
+@contextmanager
+def record(recorder=None):
+    """record spans and counts of the block into `recorder`, a new one if None"""
+    recorder = Recorder() if recorder is None else recorder
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def recording(fn, *args, **kwargs):
+    """run `fn` recording its spans and counts, picklable entry for worker
+    pools
+    @return: (result of fn, `Recorder`)
+    """
+    with record() as recorder:
+        return fn(*args, **kwargs), recorder
@@ -1,17 +1,42 @@
 #!/usr/bin/python
 # -*- coding: utf8
+import os
 import time
+from collections import deque
+from functools import partial
 from pathlib import Path
+from urllib.parse import urlencode
 
+import click
+import tornado.httpserver
+import tornado.ioloop
+import tornado.log
+import tornado.netutil
+import tornado.process
+import tornado.web
+import tornado.websocket
 from pywebio import config
-from pywebio import start_server
 from pywebio.input import *
 from pywebio.output import *
 from pywebio.pin import *
-from pywebio.session import download, go_app, run_js, set_env
+from pywebio.platform.tornado import webio_handler
+from pywebio.session import go_app, run_js, set_env
+from pywebio.utils import STATIC_PATH
 
-from sqlgen import ddlgenerator, reader
+from sqlgen import parallel, timing
+from sqlgen.cache import LRUCache, TemplateCache, file_digest
 from sqlgen.cli import parse_sheets
+from sqlgen.exceptions import SQLGenException
+from sqlgen.handlers import (
+    DDLHandler,
+    MetricsHandler,
+    SQLHandler,
+    UploadHandler,
+    ZipHandler,
+)
+from sqlgen.metrics import Counter, FunctionCounter, Gauge, Histogram, Registry
+from sqlgen.pool import WorkerPool
+from sqlgen.store import DocumentStore, Sweeper
 
 cache_dir = Path(__file__).parent.parent.joinpath(".cache")
 if not cache_dir.exists():
@@ -19,13 +44,172 @@ if not cache_dir.exists():
 
 toast_duration = 2
 
+# uploaded documents, stored once per distinct content
+store = DocumentStore(cache_dir)
+
+# opt-in, enabled by SQLGEN_CACHE_DIR
+template_cache = TemplateCache.from_env()
+
+# DDL generation runs in a bounded pool, off the server and session threads
+worker_pool = WorkerPool.from_env()
+
+# uploads are streamed into the store, larger ones are rejected
+upload_max_bytes = int(os.environ.get("SQLGEN_UPLOAD_MAX_BYTES") or 100 * 1024**2)
+
+# generated DDL by (document content hash, sheets)
+ddl_cache = LRUCache(maxsize=int(os.environ.get("SQLGEN_DDL_CACHE_SIZE") or 128))
+
+# exposed at /metrics
+registry = Registry()
+http_requests = registry.register(
+    Counter(
+        "sqlgen_http_requests_total",
+        "HTTP requests by handler, method and status code",
+        ["handler", "method", "code"],
+    )
+)
+http_seconds = registry.register(
+    Histogram(
+        "sqlgen_http_request_duration_seconds",
+        "Seconds to answer HTTP requests, websocket sessions excluded",
+        ["handler"],
+    )
+)
+stage_seconds = registry.register(
+    Histogram(
+        "sqlgen_stage_duration_seconds",
+        "Seconds of each stage of generating DDL of one sheet: "
+        "parse (read template), build (table) and render (DDL), "
+        "and their sub-stages such as parse.open or build.judge",
+        ["stage"],
+    )
+)
+template_cache_lookups = registry.register(
+    Counter(
+        "sqlgen_template_cache_lookups_total",
+        "Lookups of the template cache by result, hit or miss",
+        ["result"],
+    )
+)
+
+
+def _template_cache_hit_ratio():
+    hits = template_cache_lookups.get(result="hit")
+    misses = template_cache_lookups.get(result="miss")
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+registry.register(
+    Gauge(
+        "sqlgen_cache_hit_ratio",
+        "Ratio of cache lookups that hit, by cache: ddl or template",
+        lambda: {
+            ("ddl",): ddl_cache.hit_ratio,
+            ("template",): _template_cache_hit_ratio(),
+        },
+        ["cache"],
+    )
+)
+registry.register(
+    Gauge(
+        "sqlgen_ddl_cache_entries", "Entries in the DDL cache", lambda: len(ddl_cache)
+    )
+)
+registry.register(
+    Gauge(
+        "sqlgen_pool_queue_depth",
+        "Tasks queued or running in the worker pool",
+        lambda: worker_pool.depth,
+    )
+)
+registry.register(
+    Gauge(
+        "sqlgen_pool_max_queue",
+        "Limit of tasks queued or running in the worker pool",
+        lambda: worker_pool.max_queue,
+    )
+)
+registry.register(
+    Gauge(
+        "sqlgen_pool_workers",
+        "Workers of the worker pool",
+        lambda: worker_pool.max_workers,
+    )
+)
+registry.register(
+    FunctionCounter(
+        "sqlgen_pool_rejected_total",
+        "Tasks rejected as the worker pool queue was full",
+        lambda: worker_pool.rejected,
+    )
+)
+registry.register(
+    FunctionCounter(
+        "sqlgen_pool_timeouts_total",
+        "Tasks timed out in the worker pool",
+        lambda: worker_pool.timeouts,
+    )
+)
+registry.register(
+    Gauge("sqlgen_store_documents", "Documents in the store", lambda: len(store))
+)
+registry.register(
+    Gauge("sqlgen_store_bytes", "Total bytes of documents in the store", store.size)
+)
+registry.register(
+    FunctionCounter(
+        "sqlgen_store_evicted_total",
+        "Documents evicted from the store",
+        lambda: store.evicted_count,
+    )
+)
+
+
+def observe(recorder):
+    """feed `timing.Recorder` of a generation into metrics"""
+    for stage, seconds in recorder.spans.items():
+        for value in seconds:
+            stage_seconds.observe(value, stage=stage)
+    for result, name in (
+        ("hit", "template_cache_hits"),
+        ("miss", "template_cache_misses"),
+    ):
+        if recorder.counts.get(name):
+            template_cache_lookups.inc(recorder.counts[name], result=result)
+
+
+def log_request(handler):
+    """count request, then log it as tornado does by default"""
+    status = handler.get_status()
+    name = type(handler).__name__
+    seconds = handler.request.request_time()
+    http_requests.inc(handler=name, method=handler.request.method, code=str(status))
+    if not isinstance(handler, tornado.websocket.WebSocketHandler):
+        http_seconds.observe(seconds, handler=name)
+    if status < 400:
+        log_method = tornado.log.access_log.info
+    elif status < 500:
+        log_method = tornado.log.access_log.warning
+    else:
+        log_method = tornado.log.access_log.error
+    log_method("%d %s %.2fms", status, handler._request_summary(), 1000.0 * seconds)
+
 
 def get_existing_docs():
-    return list(cache_dir.glob("*.xlsx"))
+    return store.list()
+
+
+def doc_label(doc):
+    uploaded = time.strftime("%Y-%m-%d %H:%M", time.localtime(doc["uploaded"]))
+    return (
+        f"{doc['name']} ({doc['size'] / 1024:.1f} KB, {uploaded}, "
+        f"{len(doc['sheets'])} sheets)"
+    )
 
 
-def refresh_page():
-    run_js("window.location.reload()")
+def refresh_page(delay=0):
+    """reload page, after `delay` seconds without blocking the session"""
+    run_js(f"setTimeout(() => window.location.reload(), {int(delay * 1000)})")
 
 
 def go_back(callback=refresh_page):
@@ -47,11 +231,88 @@ def page_header():
     )
 
 
-def delete_file(file: Path):
-    if isinstance(file, str):
-        file = Path(file)
-    file.unlink(missing_ok=True)
-    return file
+def invalidate_doc(digest):
+    """drop generated DDL of document from cache"""
+    return ddl_cache.invalidate(lambda key: key[0] == digest)
+
+
+def sheet_chunks(sheets, max_size=8):
+    """split sheets into chunks of 1, 1, 2, 4, ... up to `max_size` sheets,
+    the first table is shown after one sheet is converted, yet long ranges do
+    not open the workbook once per sheet
+    """
+    chunks = list()
+    size = 1
+    while sheets:
+        chunks.append(sheets[:size])
+        sheets = sheets[size:]
+        if len(chunks) > 1:
+            size = min(size * 2, max_size)
+    return chunks
+
+
+def iter_docs(docs, sheets):
+    """generate DDL of documents, yield (index of document, (table name, DDL),
+    None) of each table in order, as soon as it is generated by the worker
+    pool or from the DDL cache, then (index, None, error) once the document
+    is done, error is None if it succeeded
+
+    Sheets of all documents go through one bounded `WorkerPool.starmap`, so
+    converting many documents never puts more tasks in flight than one pool
+    window, whatever the number of documents.
+    @param: docs: list of (path or content of workbook, digest or None)
+    @param: sheets: tuple of sheet indexes
+    """
+    keys = list()
+    for i, (template, digest) in enumerate(docs):
+        key = (digest or file_digest(template), sheets)
+        tables = ddl_cache.get(key)
+        if tables is not None:
+            yield from ((i, table, None) for table in tables)
+            yield i, None, None
+            continue
+        keys.append((i, template, key))
+
+    pending = deque()
+    failed = set()
+
+    def chunks():
+        for i, template, key in keys:
+            *head, last = sheet_chunks(sheets)
+            for chunk in head + [last]:
+                # chunks of a failed document not submitted yet are dropped
+                if i in failed:
+                    break
+                pending.append((i, key, chunk is last))
+                yield template, chunk
+
+    render = partial(timing.recording, parallel.render_tables, cache=template_cache)
+    tables = dict()
+    for result in worker_pool.starmap(render, chunks(), return_exceptions=True):
+        i, key, last = pending.popleft()
+        if i in failed:
+            continue
+        if isinstance(result, Exception):
+            failed.add(i)
+            yield i, None, result
+            continue
+        chunk, recorder = result
+        observe(recorder)
+        for table in chunk:
+            tables.setdefault(i, list()).append(table)
+            yield i, table, None
+        if last:
+            ddl_cache.put(key, tables.pop(i, list()))
+            yield i, None, None
+
+
+# keeps the store within SQLGEN_STORE_* limits, started with the server
+sweeper = Sweeper.from_env(store, on_evict=lambda doc: invalidate_doc(doc["digest"]))
+
+
+def delete_file(digest):
+    invalidate_doc(digest)
+    return store.remove(digest)
 
 
 def delete(selected):
@@ -59,12 +320,44 @@ def delete(selected):
         toast("No documents selected", duration=toast_duration, color="warning")
         return
     deleted = list()
-    for doc in selected:
-        ret = delete_file(doc)
-        deleted.append(ret.name)
+    for digest in selected:
+        doc = delete_file(digest)
+        if doc is not None:
+            deleted.append(doc["name"])
     toast(f"{','.join(deleted)} deleted", duration=toast_duration, color="success")
-    time.sleep(toast_duration)
-    refresh_page()
+    refresh_page(delay=toast_duration)
+
+
+def put_eviction_report():
+    limits = [
+        f"{sweeper.max_bytes / 1024 ** 2:.0f} MB" if sweeper.max_bytes else "",
+        f"{sweeper.max_files} files" if sweeper.max_files else "",
+        f"{sweeper.max_age / 86400:g} days unused" if sweeper.max_age else "",
+    ]
+    last_sweep = (
+        time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(store.last_sweep))
+        if store.last_sweep
+        else "never"
+    )
+    put_text(
+        f"Store: {len(store)} documents, {store.size() / 1024 ** 2:.1f} MB, "
+        f"limits: {', '.join(_ for _ in limits if _) or 'none'}; "
+        f"evicted {store.evicted_count} documents "
+        f"({store.evicted_bytes / 1024 ** 2:.1f} MB), last sweep: {last_sweep}"
+    )
+    if store.evictions:
+        put_table(
+            [
+                [
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(_["time"])),
+                    _["name"],
+                    f"{_['size'] / 1024:.1f} KB",
+                    _["reason"],
+                ]
+                for _ in store.evictions
+            ],
+            header=["Evicted", "Name", "Size", "Reason"],
+        )
 
 
 @config(theme="minty")
@@ -75,8 +368,27 @@ def documents():
         ## documents manage
     """
     )
-    options = [{"label": _.name, "value": str(_)} for _ in get_existing_docs()]
+    put_text(
+        f"DDL cache: {len(ddl_cache)}/{ddl_cache.maxsize} entries, "
+        f"{ddl_cache.hits} hits, {ddl_cache.misses} misses"
+    )
+    put_eviction_report()
+    docs = get_existing_docs()
+    options = [{"label": doc_label(_), "value": _["digest"]} for _ in docs]
     if options:
+        put_table(
+            [
+                [
+                    " / ".join(_["names"]),
+                    f"{_['size'] / 1024:.1f} KB",
+                    time.strftime("%Y-%m-%d %H:%M", time.localtime(_["uploaded"])),
+                    ", ".join(_["sheets"]),
+                    ", ".join(t for t in _["tables"] if t),
+                ]
+                for _ in docs
+            ],
+            header=["Name", "Size", "Uploaded", "Sheets", "Tables"],
+        )
         put_checkbox(name="selected", options=options, label="Select documents")
         put_button("Delete", onclick=lambda: delete(pin.selected), small=True)
     else:
@@ -84,17 +396,60 @@ def documents():
         go_back(lambda: go_app("home", new_window=False))
 
 
+# posts each selected file as request body, concurrently, the browser
+# streams them from disk
+UPLOAD_JS = """
+const input = document.getElementById("sqlgen-upload");
+const status = document.getElementById("sqlgen-upload-status");
+const upload = (file) => new Promise((resolve) => {
+    const item = document.createElement("li");
+    const progress = document.createElement("progress");
+    const text = document.createElement("span");
+    item.append(`${file.name} `, progress, text);
+    status.append(item);
+    if (maxBytes && file.size > maxBytes) {
+        text.textContent = ` larger than ${maxBytes} bytes`;
+        progress.remove();
+        return resolve(false);
+    }
+    const xhr = new XMLHttpRequest();
+    xhr.open("POST", `${url}?name=${encodeURIComponent(file.name)}`);
+    xhr.upload.onprogress = (e) => { progress.value = e.loaded / e.total; };
+    xhr.onload = () => {
+        text.textContent = xhr.status === 200
+            ? " done" : ` failed: ${xhr.responseText || xhr.statusText}`;
+        resolve(xhr.status === 200);
+    };
+    xhr.onerror = () => { text.textContent = " failed"; resolve(false); };
+    xhr.send(file);
+});
+input.onchange = async () => {
+    status.replaceChildren();
+    const done = await Promise.all(Array.from(input.files).map(upload));
+    input.value = "";
+    if (done.every(Boolean)) window.location.reload();
+};
+"""
+
+
+def put_upload():
+    limit = f" (max {upload_max_bytes / 1024 ** 2:.0f} MB)" if upload_max_bytes else ""
+    put_html(
+        f"""
+        <label for="sqlgen-upload">Upload new documents{limit}:</label>
+        <input type="file" id="sqlgen-upload" accept=".xlsx" multiple
+            class="form-control-file">
+        <ul id="sqlgen-upload-status"></ul>
+        """
+    )
+    run_js(UPLOAD_JS, url="/upload", maxBytes=upload_max_bytes)
+
+
 @config(theme="minty")
 def main():
     page_header()
+    put_upload()
     inputs = [
-        file_upload(
-            "Upload new document:",
-            name="doc",
-            accept=".xlsx",
-            multiple=False,
-            required=False,
-        ),
         input(
             "Select sheets:",
             name="sheets",
@@ -106,21 +461,24 @@ def main():
     if existing_docs:
         doc_options = [
             {
-                "label": _.name,
-                "value": str(_),
+                "label": doc_label(_),
+                "value": _["digest"],
             }
             for _ in existing_docs
         ]
-        doc_input = radio(
-            "Existing documents",
+        doc_input = checkbox(
+            "Documents",
             name="existing_docs",
             options=doc_options,
-            multiple=False,
+            value=[existing_docs[0]["digest"]],
         )
         inputs.insert(
             0,
             doc_input,
         )
+    else:
+        put_text("No documents yet, upload one to generate DDL")
+        return
 
     data = input_group(
         "Generate DDL SQL",
@@ -130,69 +488,225 @@ def main():
     if not sheets:
         sheets = "0"
 
-    if data.get("existing_docs") is not None:
-        template = data["existing_docs"]
-        doc_name = Path(template).name
-        if not Path(template).exists():
-            put_warning(f"missing file: {template}!")
-            go_back()
-            return
-    else:
-        doc = data["doc"]
-        if not doc:
-            put_warning("No file selected or uploaded!")
-            go_back()
-            return
-        template = cache_dir.joinpath(doc["filename"])
-        doc_name = doc["filename"]
-        with open(template, "wb") as f:
-            f.write(doc["content"])
-
-    clauses = list()
-    try:
-        for sheet in parse_sheets(sheets):
-            template_data = reader.parse(template, index=sheet)
-            table = ddlgenerator.parse(template_data)
-            sql = table.clause()
-            clauses.append(sql)
+    docs = list()
+    for digest in data["existing_docs"]:
+        meta = store.get(digest)
+        if meta is None or not store.path(digest).exists():
+            put_warning(f"missing document: {digest}!")
+            continue
+        store.touch(digest)
+        docs.append(meta)
+    if not docs:
+        put_warning("No documents selected!")
+        go_back()
+        return
 
-        clauses = "\n".join(clauses)
+    try:
+        sheet_indexes = tuple(parse_sheets(sheets))
     except Exception as e:
         put_error(e)
         go_back()
         return
 
-    put_markdown(
-        f"""
-    **document:** {doc_name}
-    **sheets:** {sheets}
-    """
-    )
-    put_collapse(
-        "ddl.sql",
-        [
-            put_code(f"{clauses}", language="sql"),
-        ],
-        open=True,
+    put_markdown(f"**sheets:** {sheets}")
+    results = generate_docs(docs, sheet_indexes)
+    tables = [table for doc_tables, _ in results for table in doc_tables or ()]
+    if not tables:
+        go_back()
+        return
+
+    # DDL is streamed by the server, from the DDL cache just filled
+    query = urlencode(
+        [("digest", doc["digest"]) for doc in docs] + [("sheets", sheets)]
     )
 
     def btn_download():
-        download("ddl.sql", clauses.encode("utf8"))
+        run_js("window.location.href = url", url=f"/download/ddl.sql?{query}")
+
+    def btn_download_zip():
+        run_js("window.location.href = url", url=f"/download/ddl.zip?{query}")
 
     put_buttons(
         buttons=[
             dict(label="Download", value="download", color="primary"),
+            dict(label="Download zip", value="zip", color="primary"),
             dict(label="Back", value="back", color="dark"),
         ],
-        onclick=[btn_download, refresh_page],
+        onclick=[btn_download, btn_download_zip, refresh_page],
         small=True,
     )
 
 
+def generate_docs(docs, sheets):
+    """generate DDL of documents concurrently, the DDL of each table is shown
+    as soon as it is generated, with status of each document and progress
+    @param: sheets: tuple of sheet indexes
+    @return: list of ([(table name, DDL)], error) in the order of docs
+    """
+    put_processbar("progress", label="Progress")
+    put_table(
+        [
+            [doc["name"], put_scope(f"status-{i}", put_text("converting"))]
+            for i, doc in enumerate(docs)
+        ],
+        header=["Document", "Status"],
+    )
+    for i, doc in enumerate(docs):
+        put_collapse(doc["name"], put_scope(f"ddl-{i}"), open=len(docs) == 1)
+
+    results = [(list(), None) for _ in docs]
+    total = len(docs) * len(sheets)
+    converted = 0
+    finished = set()
+    started = time.perf_counter()
+    events = iter_docs(
+        [(store.path(doc["digest"]), doc["digest"]) for doc in docs], sheets
+    )
+    try:
+        for i, table, error in events:
+            tables = results[i][0]
+            if table is not None:
+                tables.append(table)
+                put_code(table[1], language="sql", scope=f"ddl-{i}")
+                converted += 1
+                set_processbar("progress", converted / total)
+                with use_scope(f"status-{i}", clear=True):
+                    put_text(f"converting, {len(tables)}/{len(sheets)} tables")
+                continue
+
+            finished.add(i)
+            with use_scope(f"status-{i}", clear=True):
+                if error is None:
+                    seconds = time.perf_counter() - started
+                    put_success(f"{len(tables)} tables in {seconds:.2f} s")
+                else:
+                    results[i] = (None, error)
+                    put_error(error)
+    except SQLGenException as e:
+        # server busy or the like, documents not done yet fail alike
+        for i in range(len(docs)):
+            if i in finished:
+                continue
+            results[i] = (None, e)
+            with use_scope(f"status-{i}", clear=True):
+                put_error(e)
+    set_processbar("progress", 1)
+    return results
+
+
 @config(theme="minty")
 def index():
     main()
 
 
+def start_server(
+    applications, port=8080, processes=1, max_payload_size=200 * 1024**2
+):
+    """`pywebio.start_server` with the upload handler mounted at /upload,
+    the DDL API at /api/ddl, downloads at /download/ddl.sql and
+    /download/ddl.zip, and metrics at /metrics
+    @param: processes: number of server processes sharing the port, forked
+        after binding it, 0 means CPU count
+    """
+    global worker_pool
+    sockets = tornado.netutil.bind_sockets(port)
+    if processes != 1:
+        # nothing may start threads, pools or the IOLoop before forking
+        tornado.process.fork_processes(processes)
+        # every process has its own pool, the host's CPUs are shared by all
+        worker_pool = WorkerPool.from_env(processes or tornado.process.cpu_count())
+    # series of each process are told apart by scrapes of the shared port
+    registry.set_labels(worker=tornado.process.task_id() or 0)
+    # each process sweeps, the store lock keeps sweeps one at a time
+    sweeper.start()
+
+    handlers = [
+        (
+            r"/upload",
+            UploadHandler,
+            {"store": store, "max_bytes": upload_max_bytes},
+        ),
+        (
+            r"/api/ddl",
+            DDLHandler,
+            {
+                "worker_pool": worker_pool,
+                "ddl_cache": ddl_cache,
+                "template_cache": template_cache,
+                "max_bytes": upload_max_bytes,
+                "observe": observe,
+            },
+        ),
+        (r"/", webio_handler(applications, cdn=True)),
+        (
+            r"/download/ddl.sql",
+            SQLHandler,
+            {
+                "worker_pool": worker_pool,
+                "ddl_cache": ddl_cache,
+                "template_cache": template_cache,
+                "store": store,
+                "observe": observe,
+            },
+        ),
+        (
+            r"/download/ddl.zip",
+            ZipHandler,
+            {
+                "worker_pool": worker_pool,
+                "ddl_cache": ddl_cache,
+                "template_cache": template_cache,
+                "store": store,
+                "observe": observe,
+            },
+        ),
+        (r"/metrics", MetricsHandler, {"registry": registry}),
+        (
+            r"/(.*)",
+            tornado.web.StaticFileHandler,
+            {"path": STATIC_PATH, "default_filename": "index.html"},
+        ),
+    ]
+    app = tornado.web.Application(
+        handlers,
+        websocket_ping_interval=30,
+        compress_response=True,
+        log_function=log_request,
+        websocket_max_message_size=max_payload_size,
+    )
+    server = tornado.httpserver.HTTPServer(
+        app,
+        max_buffer_size=max_payload_size,
+        max_body_size=max(max_payload_size, upload_max_bytes),
+    )
+    server.add_sockets(sockets)
+    print(f"Listen on http://0.0.0.0:{port}, pid {os.getpid()}")
+    tornado.ioloop.IOLoop.current().start()
+
+
+@click.command(context_settings=dict(help_option_names=["-h", "--help"]))
+@click.option(
+    "-p",
+    "--port",
+    type=int,
+    default=8080,
+    envvar="SQLGEN_PORT",
+    show_default=True,
+    help="Port to listen on, env: SQLGEN_PORT",
+)
+@click.option(
+    "-w",
+    "--processes",
+    type=click.IntRange(min=0),
+    default=1,
+    envvar="SQLGEN_PROCESSES",
+    show_default=True,
+    help="Number of server processes behind the port, 0 means CPU count, "
+    "env: SQLGEN_PROCESSES",
+)
+def serve(port, processes):
+    start_server([index, main, documents], port=port, processes=processes)
+
+
 if __name__ == "__main__":
-    start_server([index, main, documents], port=8080)
+    serve()
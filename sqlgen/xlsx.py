@@ -0,0 +1,334 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Streaming reader of MS Excel 2007+ (.xlsx) workbooks, only standard library
+
+Worksheet XML is parsed incrementally straight from the zip archive and rows
+are yielded lazily, cell values follow the conventions of xlrd: numbers are
+float, booleans and errors are int, text and blank cells are str.
+"""
+import io
+import logging
+import mmap
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from sqlgen import timing
+from sqlgen.exceptions import InValidTemplate
+
+logger = logging.getLogger(__name__)
+
+XML_WHITESPACE = "\t\n \r"
+XML_SPACE_ATTR = "{http://www.w3.org/XML/1998/namespace}space"
+
+# same codes as `xlrd.biffh.error_text_from_code`
+ERROR_CODES = {
+    "#NULL!": 0x00,
+    "#DIV/0!": 0x07,
+    "#VALUE!": 0x0F,
+    "#REF!": 0x17,
+    "#NAME?": 0x1D,
+    "#NUM!": 0x24,
+    "#N/A": 0x2A,
+}
+
+_escaped = re.compile(r"_x[0-9A-Fa-f]{4}_")
+
+
+def is_in_memory(source):
+    """workbook given as bytes, memory-mapped file or file object, not a path"""
+    return isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)) or hasattr(
+        source, "read"
+    )
+
+
+class _MappedFile:
+    """file object over memory-mapped file, `mmap.mmap` lacks `seekable`
+    which `zipfile` requires
+    """
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+        self.read = mapped.read
+        self.seek = mapped.seek
+        self.tell = mapped.tell
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        # the mapping is owned by caller
+        return
+
+
+def file_object(source):
+    """seekable file object of in-memory workbook, paths are returned as is"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    elif isinstance(source, mmap.mmap):
+        source.seek(0)
+        return _MappedFile(source)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def source_name(source):
+    if is_in_memory(source):
+        return getattr(source, "name", None) or "<memory>"
+    return str(source)
+
+
+def _local(tag):
+    # strip namespace, both transitional and strict OOXML are accepted
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(elem):
+    t = elem.text
+    if not t:
+        return ""
+    if elem.get(XML_SPACE_ATTR) != "preserve":
+        t = t.strip(XML_WHITESPACE)
+    if "_" in t:
+        t = _escaped.sub(lambda m: chr(int(m.group(0)[2:6], 16)), t)
+    return t
+
+
+def _rich_text(elem):
+    """text of <si> or <is> element, phonetic runs are ignored"""
+    accum = list()
+    for child in elem:
+        tag = _local(child.tag)
+        if tag == "t":
+            accum.append(_text(child))
+        elif tag == "r":
+            for t in child:
+                if _local(t.tag) == "t":
+                    accum.append(_text(t))
+    return "".join(accum)
+
+
+def _column_index(cell_name):
+    """A1 => 0, Z9 => 25, AA1 => 26"""
+    colx = 0
+    for c in cell_name:
+        if "A" <= c <= "Z":
+            colx = colx * 26 + ord(c) - 64
+        elif c != "$":
+            break
+    return colx - 1
+
+
+class SheetRows:
+    """lazy iterator of worksheet rows
+
+    Set `columns` to a set of column indexes at any time to stop converting
+    values of the other columns, they are yielded as blank cells. Rows absent
+    from the worksheet XML are skipped rather than yielded empty.
+    """
+
+    def __init__(self, stream, shared_strings, columns=None):
+        self._stream = stream
+        self._shared_strings = shared_strings
+        self.columns = columns
+        self.ncols = 0
+        self._rows = self._iter_rows()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+    def project(self, columns):
+        self.columns = set(columns)
+
+    def close(self):
+        self._rows.close()
+        self._stream.close()
+
+    def _iter_rows(self):
+        sheet_data = None
+        try:
+            for event, elem in iterparse(self._stream, events=("start", "end")):
+                tag = _local(elem.tag)
+                if event == "start":
+                    if tag == "sheetData":
+                        sheet_data = elem
+                elif tag == "row":
+                    yield self._row(elem)
+                    # rows are done with, keep memory flat on long sheets
+                    sheet_data.clear()
+                elif tag == "sheetData":
+                    break
+        finally:
+            self._stream.close()
+
+    def _row(self, row_elem):
+        columns = self.columns
+        values = dict()
+        colx = -1
+        for cell in row_elem:
+            r = cell.get("r")
+            colx = _column_index(r) if r else colx + 1
+            if columns is not None and colx not in columns:
+                continue
+            value = self._value(cell)
+            if value is not None:
+                values[colx] = value
+
+        # rows are padded to the widest row seen so far, like xlrd pads rows
+        # to the width of sheet, so that data rows are as wide as the header
+        if values:
+            self.ncols = max(self.ncols, max(values) + 1)
+        row = [""] * self.ncols
+        for colx, value in values.items():
+            row[colx] = value
+        return row
+
+    def _value(self, cell):
+        cell_type = cell.get("t", "n")
+        v = None
+        for child in cell:
+            tag = _local(child.tag)
+            if tag == "v":
+                v = child
+            elif tag == "is" and cell_type == "inlineStr":
+                return _rich_text(child)
+
+        if cell_type == "n":
+            return float(v.text) if v is not None and v.text else None
+        elif cell_type == "s":
+            if v is None or not v.text:
+                return
+            return self._shared_strings[int(v.text)]
+        elif cell_type == "str":
+            return _text(v) if v is not None else None
+        elif cell_type == "b":
+            return 1 if v is not None and v.text in ("1", "true") else 0
+        elif cell_type == "e":
+            return ERROR_CODES[v.text if v is not None else "#N/A"]
+        elif cell_type == "d":
+            return _text(v) if v is not None else None
+        return
+
+
+class XlsxWorkbook:
+    """.xlsx workbook session, shared strings are loaded once on first use
+    and worksheets are streamed on demand
+
+    usage:
+        with XlsxWorkbook(file_path) as book:
+            for row in book.rows(0):
+                ...
+    """
+
+    read_type = "xlsx"
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._zf = None
+        self._names = dict()
+        self._sheets = list()
+        self._shared_strings = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"XlsxWorkbook(file_path={source_name(self.file_path)!r})"
+
+    def open(self):
+        if self._zf is not None:
+            return self
+        with timing.span("parse.open"):
+            return self._open()
+
+    def _open(self):
+        try:
+            zf = zipfile.ZipFile(file_object(self.file_path))
+        except zipfile.BadZipFile:
+            raise InValidTemplate(f"Invalid .xlsx file: {source_name(self.file_path)}")
+        # some third party files use lower case or backslash names
+        self._names = {name.replace("\\", "/").lower(): name for name in zf.namelist()}
+        if "xl/workbook.xml" not in self._names:
+            zf.close()
+            raise InValidTemplate(f"Invalid .xlsx file: {source_name(self.file_path)}")
+        self._zf = zf
+        self._sheets = self._read_workbook()
+        self._shared_strings = self._read_shared_strings()
+
+        logger.debug("The number of worksheets is {0}".format(self.nsheets))
+        logger.debug("Worksheet name(s): {0}".format(self.sheet_names))
+        return self
+
+    def close(self):
+        if self._zf is not None:
+            self._zf.close()
+            self._zf = None
+            self._shared_strings = list()
+
+    @property
+    def nsheets(self):
+        return len(self.open()._sheets)
+
+    @property
+    def sheet_names(self):
+        return [name for name, _ in self.open()._sheets]
+
+    def _open_member(self, name):
+        return self._zf.open(self._names[name.lstrip("/").lower()])
+
+    def _read_workbook(self):
+        targets = dict()
+        if "xl/_rels/workbook.xml.rels" in self._names:
+            with self._open_member("xl/_rels/workbook.xml.rels") as stream:
+                for _, elem in iterparse(stream):
+                    if _local(elem.tag) == "Relationship":
+                        # only worksheets, same as xlrd, charts are skipped
+                        if elem.get("Type", "").endswith("/worksheet"):
+                            target = elem.get("Target", "")
+                            if not target.startswith("/"):
+                                target = posixpath.join("xl", target)
+                            targets[elem.get("Id")] = posixpath.normpath(target)
+
+        sheets = list()
+        with self._open_member("xl/workbook.xml") as stream:
+            for _, elem in iterparse(stream):
+                if _local(elem.tag) == "sheet":
+                    rid = next(
+                        (v for k, v in elem.attrib.items() if _local(k) == "id"), None
+                    )
+                    if rid in targets:
+                        sheets.append((elem.get("name"), targets[rid]))
+        return sheets
+
+    def _read_shared_strings(self):
+        shared_strings = list()
+        if "xl/sharedstrings.xml" not in self._names:
+            return shared_strings
+        with self._open_member("xl/sharedStrings.xml") as stream:
+            for _, elem in iterparse(stream):
+                if _local(elem.tag) == "si":
+                    shared_strings.append(_rich_text(elem))
+                    elem.clear()
+        return shared_strings
+
+    def rows(self, index=0, columns=None):
+        """stream rows of worksheet
+        @param: index: index of Excel worksheets
+        @param: columns: indexes of columns to read, None means all columns
+        """
+        name, target = self.open()._sheets[index]
+        logger.debug(f"Stream worksheet {name} from {target}")
+        return SheetRows(self._open_member(target), self._shared_strings, columns)
+
+    def unload(self, index=0):
+        # rows are streamed, nothing is kept in memory
+        return
@@ -0,0 +1,165 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+usage:
+    git worktree add /tmp/sqlgen-0.1.6 <commit of 0.1.6>
+    python -m tests.benchmark --sqlgen /tmp/sqlgen-0.1.6 -o bench-0.1.6.json
+    python -m tests.benchmark --compare bench-0.1.6.json
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from tests.benchmark.workbook import write_workbook
+
+
+@click.command(context_settings=dict(help_option_names=["-h", "--help"]))
+@click.option(
+    "--sqlgen",
+    "source",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Benchmark sqlgen of this source tree, such as a checkout of an older "
+    "release, instead of the one on sys.path",
+)
+@click.option(
+    "-w",
+    "--workbook",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Benchmark this workbook instead of a synthetic one, all its sheets",
+)
+@click.option(
+    "--sheets",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="number of sheets of synthetic workbook",
+)
+@click.option(
+    "--fields",
+    type=click.IntRange(min=1),
+    default=50,
+    show_default=True,
+    help="number of fields of each synthetic sheet",
+)
+@click.option(
+    "--seed", type=int, default=0, show_default=True, help="seed of synthetic fields"
+)
+@click.option(
+    "-r",
+    "--read-type",
+    default="excel",
+    show_default=True,
+    help="reader backend, excel or xlsx if the benchmarked sqlgen has it",
+)
+@click.option(
+    "--style",
+    default="compat",
+    show_default=True,
+    help="layout of rendered DDL, compat, or pretty or compact if the "
+    "benchmarked sqlgen has them",
+)
+@click.option(
+    "--intern",
+    is_flag=True,
+    default=False,
+    help="share identical fields across tables, if the benchmarked sqlgen "
+    "has field interning",
+)
+@click.option(
+    "-n",
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="number of timed passes over all sheets",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Save result as JSON into file, default to stdout",
+)
+@click.option(
+    "--save-workbook",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Keep the synthetic workbook in this file",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="JSON result of a previous run, exit 1 if any stage regressed",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=0.1,
+    show_default=True,
+    help="ratio of slowdown over '--compare' result reported as regression",
+)
+def main(
+    source,
+    workbook,
+    sheets,
+    fields,
+    seed,
+    read_type,
+    style,
+    intern,
+    repeat,
+    output,
+    save_workbook,
+    compare,
+    threshold,
+):
+    if source:
+        # sqlgen is imported first by the runner, from this tree
+        sys.path.insert(0, str(Path(source).resolve()))
+    from tests.benchmark import runner
+
+    try:
+        runner.check(read_type, style, intern)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if workbook is None:
+            workbook = save_workbook or str(Path(tmp).joinpath("benchmark.xlsx"))
+            write_workbook(workbook, sheets=sheets, fields=fields, seed=seed)
+        indexes = range(runner.count_sheets(workbook, read_type))
+        result = runner.run(
+            workbook,
+            indexes,
+            read_type=read_type,
+            repeat=repeat,
+            style=style,
+            intern=intern,
+        )
+
+    text = json.dumps(result, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        click.echo(text)
+    click.echo(runner.format_result(result), err=True)
+
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        rows, regressed = runner.compare(result, baseline, threshold)
+        click.echo("\n" + runner.format_comparison(rows), err=True)
+        if regressed:
+            click.echo(f"Regressed: {', '.join(regressed)}", err=True)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Time each stage of DDL generation over the sheets of a workbook
+
+Stages are timed separately on the same sheets: open (workbook session),
+reader.parse (template of sheet), ddlgenerator.parse (table of template)
+and Table.clause (DDL of table), then their total. Every repeat opens the
+workbook again, the fastest repeat is the most stable figure to compare
+releases by.
+
+Only the public path of every release, `reader.parse`, `ddlgenerator.parse`
+and `Table.clause`, is required. Later additions, workbook sessions and DDL
+styles, are used when the imported sqlgen has them, so the same runner times
+older releases, stages missing there are left out. Field interning is opt-in
+as in the command.
+"""
+import importlib.util
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+import sqlgen
+from sqlgen import ddlgenerator, reader
+
+try:
+    from sqlgen import render
+except ImportError:
+    render = None
+
+STAGES = ("open", "reader.parse", "ddlgenerator.parse", "Table.clause")
+
+READ_TYPES = getattr(reader, "READ_TYPES", ("excel",))
+STYLES = render.STYLES if render is not None else ("compat",)
+
+# workbook sessions and field interning, None in releases without them
+_open_workbook = getattr(reader, "open_workbook", None)
+_FieldInterner = getattr(ddlgenerator, "FieldInterner", None)
+
+
+def _load_timing():
+    # sqlgen.timing of this checkout, for its table formatter, the imported
+    # sqlgen may be an older release without it
+    path = Path(__file__).resolve().parents[2].joinpath("sqlgen", "timing.py")
+    spec = importlib.util.spec_from_file_location("_benchmark_timing", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+format_rows = _load_timing().format_rows
+
+
+def revision():
+    """`git describe` of the source tree sqlgen is imported from, None if it
+    is not a git checkout
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--tags"],
+            cwd=Path(sqlgen.__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check(read_type="excel", style="compat", intern=False):
+    """raise ValueError if the imported sqlgen has no `read_type`, `style` or
+    field interning
+    """
+    if read_type not in READ_TYPES:
+        raise ValueError(f"Reader {read_type!r} not in sqlgen {sqlgen.__version__}")
+    if style not in STYLES:
+        raise ValueError(f"Style {style!r} not in sqlgen {sqlgen.__version__}")
+    if intern and _FieldInterner is None:
+        raise ValueError(f"Field interning not in sqlgen {sqlgen.__version__}")
+
+
+def count_sheets(file_path, read_type="excel"):
+    if _open_workbook is not None:
+        with _open_workbook(file_path, read_type) as book:
+            return book.nsheets
+    import xlrd
+
+    return xlrd.open_workbook(file_path, on_demand=True).nsheets
+
+
+def _parse(file_path, sheet, read_type, book):
+    if book is None:
+        return reader.parse(file_path, read_type=read_type, index=sheet)
+    return reader.parse(file_path, read_type=read_type, index=sheet, book=book)
+
+
+def run_once(file_path, sheets, read_type="excel", style="compat", intern=False):
+    """seconds of each stage over all `sheets` of one pass"""
+    seconds = dict.fromkeys(STAGES, 0.0)
+    fields = 0
+    clock = time.perf_counter
+    book = None
+    if _open_workbook is not None:
+        book = _open_workbook(file_path, read_type)
+        start = clock()
+        book.open()
+        seconds["open"] += clock() - start
+    else:
+        # workbook is opened by reader.parse of each sheet
+        del seconds["open"]
+    # fields are interned within a pass, as within one run of the command
+    build = ddlgenerator.parse
+    if intern:
+        build = partial(ddlgenerator.parse, interner=_FieldInterner())
+    clause_args = () if style == "compat" else (style,)
+
+    try:
+        for sheet in sheets:
+            start = clock()
+            template = _parse(file_path, sheet, read_type, book)
+            parsed = clock()
+            table = build(template)
+            built = clock()
+            table.clause(*clause_args)
+            rendered = clock()
+
+            seconds["reader.parse"] += parsed - start
+            seconds["ddlgenerator.parse"] += built - parsed
+            seconds["Table.clause"] += rendered - built
+            fields += len(table.columns)
+    finally:
+        if book is not None:
+            book.close()
+    # stages of releases differ, open is part of reader.parse without sessions
+    seconds["total"] = sum(seconds.values())
+    return seconds, fields
+
+
+def run(
+    file_path,
+    sheets,
+    read_type="excel",
+    repeat=5,
+    warmup=1,
+    style="compat",
+    intern=False,
+):
+    """benchmark result as JSON serializable dict
+    @param: sheets: indexes of worksheets, each pass goes through all of them
+    @param: repeat: number of timed passes
+    @param: warmup: number of passes before timing, not recorded
+    @param: intern: share identical fields across the tables of each pass
+    """
+    check(read_type, style, intern)
+    sheets = list(sheets)
+    for _ in range(warmup):
+        run_once(file_path, sheets, read_type, style, intern)
+
+    passes = list()
+    fields = 0
+    for _ in range(repeat):
+        seconds, fields = run_once(file_path, sheets, read_type, style, intern)
+        passes.append(seconds)
+
+    stages = dict()
+    for stage in passes[0]:
+        values = [_[stage] for _ in passes]
+        stages[stage] = {
+            "min": min(values),
+            "median": statistics.median(values),
+            "mean": statistics.mean(values),
+            "max": max(values),
+            "per_sheet": min(values) / len(sheets),
+            "per_field": min(values) / fields if fields else 0.0,
+        }
+    return {
+        "sqlgen": sqlgen.__version__,
+        "revision": revision(),
+        "source": str(Path(sqlgen.__file__).parent.parent),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "argv": sys.argv[1:],
+        "read_type": read_type,
+        "style": style,
+        "intern": intern,
+        "sheets": len(sheets),
+        "fields": fields,
+        "repeat": repeat,
+        "stages": stages,
+    }
+
+
+def compare(result, baseline, threshold=0.1):
+    """stages slower than `baseline` by more than `threshold` (ratio of
+    fastest passes)
+    @return: list of (stage, baseline seconds, seconds, ratio) of every stage,
+        and list of stages regressed
+    """
+    rows, regressed = list(), list()
+    for stage, stats in result["stages"].items():
+        before = baseline.get("stages", dict()).get(stage)
+        if not before or not before["min"]:
+            continue
+        ratio = stats["min"] / before["min"]
+        rows.append((stage, before["min"], stats["min"], ratio))
+        if ratio > 1 + threshold:
+            regressed.append(stage)
+    return rows, regressed
+
+
+def format_result(result):
+    """result as text table"""
+    header = ("stage", "min(s)", "median(s)", "per sheet(ms)", "per field(us)")
+    rows = [
+        (
+            stage,
+            f"{stats['min']:.4f}",
+            f"{stats['median']:.4f}",
+            f"{stats['per_sheet'] * 1e3:.3f}",
+            f"{stats['per_field'] * 1e6:.2f}",
+        )
+        for stage, stats in result["stages"].items()
+    ]
+    return format_rows(header, rows)
+
+
+def format_comparison(rows):
+    header = ("stage", "baseline(s)", "current(s)", "ratio")
+    rows = [
+        (stage, f"{before:.4f}", f"{after:.4f}", f"{ratio:.2f}")
+        for stage, before, after, ratio in rows
+    ]
+    return format_rows(header, rows)
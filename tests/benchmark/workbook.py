@@ -0,0 +1,244 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Synthetic template workbooks for benchmarks, written with standard library
+
+Each worksheet follows the documented template layout: 库名, 表名 and 表中文名
+rows, the 序号 header row, then fields of mixed types, keys and defaults, and
+notes below the fields. Workbooks are deterministic for the same arguments.
+
+usage:
+    write_workbook("bench.xlsx", sheets=20, fields=50)
+    write_rows("sheets.xlsx", [[["表名", "t_a"], HEADER, [1, "id", ...]]])
+"""
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+HEADER = [
+    "序号",
+    "字段名称",
+    "字段中文名",
+    "单位",
+    "字段类型",
+    "字段长度",
+    "能否为空",
+    "默认值",
+    "字段属性",
+    "附加属性",
+    "备注",
+]
+
+# (type, length, default when the field has one)
+TYPES = [
+    ("varchar", 255, "unknown"),
+    ("varchar", 1000, ""),
+    ("char", 36, ""),
+    ("bigint", 20, -1),
+    ("int", 11, 0),
+    ("tinyint", 3, 0),
+    ("decimal", "18,4", 0),
+    ("datetime", "", "CURRENT_TIMESTAMP"),
+    ("date", "", ""),
+    ("text", "", ""),
+]
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+{sheets}
+</Types>"""
+
+CONTENT_TYPE_SHEET = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>{sheets}</sheets>
+</workbook>"""
+
+WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{n}" r:id="rId{n}"/>'
+
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{sheets}
+<Relationship Id="rId{styles}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId{strings}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+</Relationships>"""
+
+WORKBOOK_RELS_SHEET = (
+    '<Relationship Id="rId{n}" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{n}.xml"/>'
+)
+
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="0"/>
+<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="1"><fill><patternFill patternType="none"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>
+</styleSheet>"""
+
+SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="{count}" uniqueCount="{count}">{strings}</sst>"""
+
+WORKSHEET = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<sheetData>{rows}</sheetData>
+</worksheet>"""
+
+
+def column_name(colx):
+    """A, B, ..., Z, AA, ... of 0-based column index"""
+    name = ""
+    colx += 1
+    while colx:
+        colx, rem = divmod(colx - 1, 26)
+        name = chr(ord("A") + rem) + name
+    return name
+
+
+def synthetic_fields(n, rng):
+    """rows of `n` fields, an auto increment primary key first and an update
+    time last, the others of random types, keys and defaults
+    """
+    fields = [["id", "自增主键", "", "bigint", 20, "N", "", "主键", "auto_increment"]]
+    for i in range(2, n):
+        data_type, length, default = rng.choice(TYPES)
+        key = rng.choices(["", "索引", "唯一索引"], weights=[85, 12, 3])[0]
+        if data_type == "text":
+            key = ""
+        null = "N" if key else rng.choice(["Y", "Y", "N"])
+        fields.append(
+            [
+                f"{data_type}_col_{i}",
+                f"字段{i}",
+                "",
+                data_type,
+                length,
+                null,
+                default if rng.random() < 0.3 else "",
+                key,
+                "",
+            ]
+        )
+    if n > 1:
+        fields.append(
+            [
+                "row_update_time",
+                "记录更新时间",
+                "",
+                "datetime",
+                "",
+                "Y",
+                "CURRENT_TIMESTAMP",
+                "",
+                "on update CURRENT_TIMESTAMP",
+            ]
+        )
+    return [[seq] + field + [""] for seq, field in enumerate(fields[:n], 1)]
+
+
+def sheet_rows(index, fields, rng):
+    """rows of worksheet `index` in template layout"""
+    rows = [
+        ["库名", "db_benchmark", "是否分库"],
+        ["表名", f"t_benchmark_{index}", "是否分表"],
+        ["表中文名", f"基准测试表{index}", "更新频率"],
+        ["预计数据量", 10000, ""],
+        [],
+        ["业务主键：id"],
+        HEADER,
+    ]
+    rows.extend(synthetic_fields(fields, rng))
+    rows.extend([[], [], ["需求详述："], [f"基准测试表{index}，由脚本生成"]])
+    return rows
+
+
+class _SharedStrings:
+    def __init__(self):
+        self.index = dict()
+
+    def __call__(self, value):
+        return self.index.setdefault(value, len(self.index))
+
+    def xml(self):
+        strings = "".join(f"<si><t>{escape(_)}</t></si>" for _ in self.index)
+        return SHARED_STRINGS.format(count=len(self.index), strings=strings)
+
+
+def _worksheet(rows, shared_strings):
+    xml_rows = list()
+    for rowx, row in enumerate(rows, 1):
+        cells = list()
+        for colx, value in enumerate(row):
+            if value == "" or value is None:
+                continue
+            ref = f"{column_name(colx)}{rowx}"
+            if isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="s"><v>{shared_strings(value)}</v></c>')
+        xml_rows.append(f'<row r="{rowx}">{"".join(cells)}</row>')
+    return WORKSHEET.format(rows="".join(xml_rows))
+
+
+def write_workbook(file, sheets=10, fields=30, seed=0):
+    """write synthetic template workbook of `sheets` worksheets with `fields`
+    fields each
+    @param: file: path or writable binary file object
+    @param: seed: seed of random types, keys and defaults
+    """
+    rng = random.Random(seed)
+    write_rows(file, [sheet_rows(i, fields, rng) for i in range(sheets)])
+
+
+def write_rows(file, sheets):
+    """write workbook of worksheets given as lists of rows, cells are str or
+    numbers, blank cells "" or None
+    @param: file: path or writable binary file object
+    """
+    shared_strings = _SharedStrings()
+    worksheets = [_worksheet(rows, shared_strings) for rows in sheets]
+    numbers = range(1, len(worksheets) + 1)
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            CONTENT_TYPES.format(
+                sheets="\n".join(CONTENT_TYPE_SHEET.format(n=n) for n in numbers)
+            ),
+        )
+        zf.writestr("_rels/.rels", ROOT_RELS)
+        zf.writestr(
+            "xl/workbook.xml",
+            WORKBOOK.format(
+                sheets="".join(
+                    WORKBOOK_SHEET.format(name=f"Template{n}", n=n) for n in numbers
+                )
+            ),
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            WORKBOOK_RELS.format(
+                sheets="\n".join(WORKBOOK_RELS_SHEET.format(n=n) for n in numbers),
+                styles=len(worksheets) + 1,
+                strings=len(worksheets) + 2,
+            ),
+        )
+        zf.writestr("xl/styles.xml", STYLES)
+        for n, worksheet in zip(numbers, worksheets):
+            zf.writestr(f"xl/worksheets/sheet{n}.xml", worksheet)
+        zf.writestr("xl/sharedStrings.xml", shared_strings.xml())
@@ -0,0 +1,37 @@
+
+CREATE TABLE 
+    IF NOT EXISTS `t_sz_ipoguidancestate`
+    (
+      		`id` BIGINT(20) NOT NULL  AUTO_INCREMENT COMMENT '自增主键'
+		, `credit_no` VARCHAR(255) NOT NULL DEFAULT ""  COMMENT '社会信用代码'
+		, `name` VARCHAR(255)  DEFAULT ""  COMMENT '企业名称'
+		, `eid` CHAR(36)  DEFAULT ""  COMMENT '企业ID'
+		, `updatedate` DATETIME    COMMENT '最新变更日期'
+		, `type` VARCHAR(200)  DEFAULT ""  COMMENT '辅导企业公司类型'
+		, `csrc` VARCHAR(20)  DEFAULT ""  COMMENT '所属证监局'
+		, `guidanceagency` VARCHAR(200)  DEFAULT ""  COMMENT '辅导机构'
+		, `url` VARCHAR(1000)  DEFAULT ""  COMMENT '公告网址'
+		, `recorddate` DATETIME    COMMENT '辅导备案日'
+		, `submissiondate` DATETIME    COMMENT '报送备案登记材料日'
+		, `reportdate` DATETIME    COMMENT '出具辅导监管报告日期'
+		, `progressreportdate` DATETIME    COMMENT '最近一期递交辅导进展报告日期'
+		, `changesponsordate` DATETIME    COMMENT '更换保荐机构日'
+		, `summaryreportdate` DATETIME    COMMENT 'IPO辅导总结报告日期'
+		, `terminationdate` DATETIME    COMMENT '终止辅导日期'
+		, `signdate` DATETIME    COMMENT '签署辅导协议日'
+		, `otherdate` DATETIME    COMMENT '其他重要日期'
+		, `status` VARCHAR(255)  DEFAULT ""  COMMENT '当前辅导状态'
+		, `accountingfirm` VARCHAR(255)  DEFAULT ""  COMMENT '会计师事务所'
+		, `legaladvisor` VARCHAR(255)  DEFAULT ""  COMMENT '律师事务所'
+		, `source` CHAR(20)  DEFAULT ""  COMMENT '数据来源'
+		, `u_tags` TINYINT(3)  DEFAULT 0  COMMENT '是否隐藏'
+		, `create_time` BIGINT(20)  DEFAULT -1  COMMENT '记录创建时间'
+		, `row_update_time` DATETIME  DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '记录更新时间'
+
+      	, PRIMARY KEY `pk_id` (`id`)
+	, INDEX `idx_credit_no` USING BTREE(`credit_no`)
+	, INDEX `idx_eid` USING BTREE(`eid`)
+
+    )
+    ENGINE=InnoDB AUTO_INCREMENT=0 DEFAULT CHARSET=utf8mb4 ROW_FORMAT=DYNAMIC COMMENT='IPO辅导状态表'
+;
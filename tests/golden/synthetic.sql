@@ -0,0 +1,132 @@
+
+CREATE TABLE 
+    IF NOT EXISTS `t_benchmark_0`
+    (
+      		`id` BIGINT(20) NOT NULL  AUTO_INCREMENT COMMENT '自增主键'
+		, `tinyint_col_2` TINYINT(3) NOT NULL   COMMENT '字段2'
+		, `varchar_col_3` VARCHAR(255) NOT NULL DEFAULT "unknown"  COMMENT '字段3'
+		, `text_col_4` TEXT NOT NULL   COMMENT '字段4'
+		, `varchar_col_5` VARCHAR(1000)  DEFAULT ""  COMMENT '字段5'
+		, `date_col_6` DATE NOT NULL   COMMENT '字段6'
+		, `bigint_col_7` BIGINT(20) NOT NULL   COMMENT '字段7'
+		, `text_col_8` TEXT    COMMENT '字段8'
+		, `varchar_col_9` VARCHAR(255)  DEFAULT "unknown"  COMMENT '字段9'
+		, `char_col_10` CHAR(36) NOT NULL DEFAULT ""  COMMENT '字段10'
+		, `char_col_11` CHAR(36) NOT NULL DEFAULT ""  COMMENT '字段11'
+		, `tinyint_col_12` TINYINT(3) NOT NULL DEFAULT 0  COMMENT '字段12'
+		, `varchar_col_13` VARCHAR(255)  DEFAULT ""  COMMENT '字段13'
+		, `decimal_col_14` DECIMAL(18, 4)    COMMENT '字段14'
+		, `datetime_col_15` DATETIME    COMMENT '字段15'
+		, `bigint_col_16` BIGINT(20)    COMMENT '字段16'
+		, `tinyint_col_17` TINYINT(3)    COMMENT '字段17'
+		, `varchar_col_18` VARCHAR(1000)  DEFAULT ""  COMMENT '字段18'
+		, `tinyint_col_19` TINYINT(3)    COMMENT '字段19'
+		, `varchar_col_20` VARCHAR(1000) NOT NULL DEFAULT ""  COMMENT '字段20'
+		, `tinyint_col_21` TINYINT(3)    COMMENT '字段21'
+		, `text_col_22` TEXT    COMMENT '字段22'
+		, `int_col_23` INT(11) NOT NULL DEFAULT 0  COMMENT '字段23'
+		, `int_col_24` INT(11) NOT NULL   COMMENT '字段24'
+		, `int_col_25` INT(11) NOT NULL   COMMENT '字段25'
+		, `datetime_col_26` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP  COMMENT '字段26'
+		, `varchar_col_27` VARCHAR(255)  DEFAULT "unknown"  COMMENT '字段27'
+		, `bigint_col_28` BIGINT(20)  DEFAULT -1  COMMENT '字段28'
+		, `datetime_col_29` DATETIME    COMMENT '字段29'
+		, `row_update_time` DATETIME  DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '记录更新时间'
+
+      	, PRIMARY KEY `pk_id` (`id`)
+	, INDEX `idx_tinyint_col_2` USING BTREE(`tinyint_col_2`)
+
+    )
+    ENGINE=InnoDB AUTO_INCREMENT=0 DEFAULT CHARSET=utf8mb4 ROW_FORMAT=DYNAMIC COMMENT='基准测试表0'
+;
+
+
+CREATE TABLE 
+    IF NOT EXISTS `t_benchmark_1`
+    (
+      		`id` BIGINT(20) NOT NULL  AUTO_INCREMENT COMMENT '自增主键'
+		, `decimal_col_2` DECIMAL(18, 4) NOT NULL DEFAULT 0  COMMENT '字段2'
+		, `decimal_col_3` DECIMAL(18, 4) NOT NULL   COMMENT '字段3'
+		, `decimal_col_4` DECIMAL(18, 4) NOT NULL DEFAULT 0  COMMENT '字段4'
+		, `char_col_5` CHAR(36) NOT NULL DEFAULT ""  COMMENT '字段5'
+		, `datetime_col_6` DATETIME  DEFAULT CURRENT_TIMESTAMP  COMMENT '字段6'
+		, `varchar_col_7` VARCHAR(255) NOT NULL DEFAULT ""  COMMENT '字段7'
+		, `text_col_8` TEXT    COMMENT '字段8'
+		, `date_col_9` DATE NOT NULL   COMMENT '字段9'
+		, `varchar_col_10` VARCHAR(255) NOT NULL DEFAULT ""  COMMENT '字段10'
+		, `decimal_col_11` DECIMAL(18, 4)  DEFAULT 0  COMMENT '字段11'
+		, `decimal_col_12` DECIMAL(18, 4)    COMMENT '字段12'
+		, `datetime_col_13` DATETIME    COMMENT '字段13'
+		, `varchar_col_14` VARCHAR(1000)  DEFAULT ""  COMMENT '字段14'
+		, `tinyint_col_15` TINYINT(3)    COMMENT '字段15'
+		, `text_col_16` TEXT NOT NULL   COMMENT '字段16'
+		, `tinyint_col_17` TINYINT(3)  DEFAULT 0  COMMENT '字段17'
+		, `datetime_col_18` DATETIME NOT NULL   COMMENT '字段18'
+		, `datetime_col_19` DATETIME  DEFAULT CURRENT_TIMESTAMP  COMMENT '字段19'
+		, `tinyint_col_20` TINYINT(3)    COMMENT '字段20'
+		, `char_col_21` CHAR(36)  DEFAULT ""  COMMENT '字段21'
+		, `date_col_22` DATE NOT NULL   COMMENT '字段22'
+		, `varchar_col_23` VARCHAR(255)  DEFAULT ""  COMMENT '字段23'
+		, `varchar_col_24` VARCHAR(1000)  DEFAULT ""  COMMENT '字段24'
+		, `char_col_25` CHAR(36)  DEFAULT ""  COMMENT '字段25'
+		, `date_col_26` DATE    COMMENT '字段26'
+		, `bigint_col_27` BIGINT(20)    COMMENT '字段27'
+		, `bigint_col_28` BIGINT(20)    COMMENT '字段28'
+		, `varchar_col_29` VARCHAR(255) NOT NULL DEFAULT ""  COMMENT '字段29'
+		, `row_update_time` DATETIME  DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '记录更新时间'
+
+      	, PRIMARY KEY `pk_id` (`id`)
+	, INDEX `idx_decimal_col_2` USING BTREE(`decimal_col_2`)
+	, INDEX `idx_decimal_col_4` USING BTREE(`decimal_col_4`)
+	, INDEX `idx_date_col_9` USING BTREE(`date_col_9`)
+	, UNIQUE KEY `uk_decimal_col_3_datetime_col_18` (`decimal_col_3`,`datetime_col_18`,`varchar_col_29`)
+
+    )
+    ENGINE=InnoDB AUTO_INCREMENT=0 DEFAULT CHARSET=utf8mb4 ROW_FORMAT=DYNAMIC COMMENT='基准测试表1'
+;
+
+
+CREATE TABLE 
+    IF NOT EXISTS `t_benchmark_2`
+    (
+      		`id` BIGINT(20) NOT NULL  AUTO_INCREMENT COMMENT '自增主键'
+		, `datetime_col_2` DATETIME NOT NULL   COMMENT '字段2'
+		, `tinyint_col_3` TINYINT(3) NOT NULL   COMMENT '字段3'
+		, `tinyint_col_4` TINYINT(3)  DEFAULT 0  COMMENT '字段4'
+		, `bigint_col_5` BIGINT(20)    COMMENT '字段5'
+		, `text_col_6` TEXT    COMMENT '字段6'
+		, `tinyint_col_7` TINYINT(3)    COMMENT '字段7'
+		, `varchar_col_8` VARCHAR(1000) NOT NULL DEFAULT ""  COMMENT '字段8'
+		, `bigint_col_9` BIGINT(20)    COMMENT '字段9'
+		, `tinyint_col_10` TINYINT(3) NOT NULL   COMMENT '字段10'
+		, `decimal_col_11` DECIMAL(18, 4)    COMMENT '字段11'
+		, `char_col_12` CHAR(36) NOT NULL DEFAULT ""  COMMENT '字段12'
+		, `text_col_13` TEXT NOT NULL   COMMENT '字段13'
+		, `text_col_14` TEXT NOT NULL   COMMENT '字段14'
+		, `char_col_15` CHAR(36)  DEFAULT ""  COMMENT '字段15'
+		, `varchar_col_16` VARCHAR(1000)  DEFAULT ""  COMMENT '字段16'
+		, `bigint_col_17` BIGINT(20)  DEFAULT -1  COMMENT '字段17'
+		, `bigint_col_18` BIGINT(20)    COMMENT '字段18'
+		, `tinyint_col_19` TINYINT(3)    COMMENT '字段19'
+		, `varchar_col_20` VARCHAR(255) NOT NULL DEFAULT ""  COMMENT '字段20'
+		, `datetime_col_21` DATETIME NOT NULL   COMMENT '字段21'
+		, `date_col_22` DATE    COMMENT '字段22'
+		, `varchar_col_23` VARCHAR(255) NOT NULL DEFAULT ""  COMMENT '字段23'
+		, `text_col_24` TEXT    COMMENT '字段24'
+		, `datetime_col_25` DATETIME    COMMENT '字段25'
+		, `tinyint_col_26` TINYINT(3) NOT NULL   COMMENT '字段26'
+		, `varchar_col_27` VARCHAR(1000) NOT NULL DEFAULT ""  COMMENT '字段27'
+		, `bigint_col_28` BIGINT(20)    COMMENT '字段28'
+		, `date_col_29` DATE    COMMENT '字段29'
+		, `row_update_time` DATETIME  DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '记录更新时间'
+
+      	, PRIMARY KEY `pk_id` (`id`)
+	, INDEX `idx_varchar_col_8` USING BTREE(`varchar_col_8`)
+	, INDEX `idx_varchar_col_20` USING BTREE(`varchar_col_20`)
+	, INDEX `idx_varchar_col_23` USING BTREE(`varchar_col_23`)
+	, INDEX `idx_varchar_col_27` USING BTREE(`varchar_col_27`)
+	, UNIQUE KEY `uk_char_col_12` (`char_col_12`)
+
+    )
+    ENGINE=InnoDB AUTO_INCREMENT=0 DEFAULT CHARSET=utf8mb4 ROW_FORMAT=DYNAMIC COMMENT='基准测试表2'
+;
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf8
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sqlgen import batch
+from sqlgen.cli import main
+
+TEMPLATE = Path(__file__).parent.joinpath("excel_template.xlsx")
+
+
+def _runner():
+    # stderr is kept apart by default since click 8.2
+    try:
+        return CliRunner(mix_stderr=False)
+    except TypeError:
+        return CliRunner()
+
+
+def test_output_paths_keep_directories(tmp_path):
+    files = [tmp_path.joinpath("a", "x.xlsx"), tmp_path.joinpath("b", "x.xlsx")]
+    paths = batch.output_paths(files, "ddl")
+    assert paths == {
+        files[0]: Path("ddl", "a", "x.sql"),
+        files[1]: Path("ddl", "b", "x.sql"),
+    }
+    assert batch.output_paths(files[:1], "ddl") == {files[0]: Path("ddl", "x.sql")}
+
+
+def test_output_paths_collision(tmp_path):
+    files = [tmp_path.joinpath("x.xlsx"), tmp_path.joinpath("x.XLSX")]
+    with pytest.raises(ValueError):
+        batch.output_paths(files, "ddl")
+
+
+def test_cli_no_templates_matched(tmp_path):
+    result = CliRunner().invoke(main, ["-t", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "No templates matched" in result.output
+
+
+def test_cli_directory_of_one_template_is_batch(tmp_path):
+    for folder in ("a", "b"):
+        tmp_path.joinpath("in", folder).mkdir(parents=True)
+        shutil.copy(TEMPLATE, tmp_path.joinpath("in", folder, "x.xlsx"))
+    out = tmp_path.joinpath("out")
+    result = _runner().invoke(
+        main, [str(tmp_path.joinpath("in", "a")), "--output-dir", str(out)]
+    )
+    assert result.exit_code == 0, result.stderr
+    assert "total: 1 files, 0 failed" in result.stderr
+    assert out.joinpath("x.sql").exists()
+
+    result = CliRunner().invoke(
+        main, [str(tmp_path.joinpath("in")), "--output-dir", str(out)]
+    )
+    assert result.exit_code == 0
+    assert (
+        out.joinpath("a", "x.sql").read_text() == out.joinpath("b", "x.sql").read_text()
+    )
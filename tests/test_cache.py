@@ -0,0 +1,30 @@
+#!/usr/bin/python
+# -*- coding: utf8
+from sqlgen.cache import TemplateCache
+
+
+def _files_size(cache):
+    return sum(_.stat().st_size for _ in cache.cache_dir.glob("*/*.pickle"))
+
+
+def test_put_same_key_twice(tmp_path):
+    cache = TemplateCache(tmp_path)
+    assert cache.size() == 0
+    cache.put("digest", 0, "excel", {"Table": "t", "Fields": []})
+    first = cache.size()
+    assert first == _files_size(cache)
+
+    cache.put("digest", 0, "excel", {"Table": "t", "Fields": list(range(100))})
+    assert cache.size() == _files_size(cache) > first
+    assert cache.size() == TemplateCache(tmp_path).size()
+    assert cache.get("digest", 0, "excel")["Fields"] == list(range(100))
+
+
+def test_put_keeps_within_max_bytes(tmp_path):
+    cache = TemplateCache(tmp_path, max_bytes=1024)
+    template = {"Table": "t", "Fields": list(range(100))}
+    for _ in range(10):
+        cache.put("digest", 0, "excel", template)
+    # the one entry fits, rewriting it never counts as growth
+    assert cache.get("digest", 0, "excel") == template
+    assert cache.size() == _files_size(cache) < 1024
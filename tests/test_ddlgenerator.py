@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf8
+import pickle
+
+import pytest
+
+from sqlgen import ddlgenerator
+from sqlgen.ddlgenerator import Field, FieldInterner
+
+
+def _field():
+    return Field("name", "VARCHAR", 255, ["AUTO_INCREMENT"], False, "x", "名称", "INDEX")
+
+
+def test_field_is_immutable():
+    field = _field()
+    with pytest.raises(AttributeError):
+        field.Name = "other"
+    with pytest.raises(AttributeError):
+        field.other = 1
+    assert field.Extra == ("AUTO_INCREMENT",)
+    assert field.Default == '"x"'
+
+
+def test_field_pickle_keeps_validated_values():
+    field = _field()
+    field.clause()
+    copy = pickle.loads(pickle.dumps(field))
+    assert copy == field
+    assert copy.Default == '"x"'
+    assert copy.clause() == field.clause()
+    assert copy.clause(padded=False) == field.clause(padded=False)
+
+
+def _template(**values):
+    c = dict(
+        Name="flag",
+        Type="TINYINT",
+        Length=1,
+        Extra=None,
+        Null=True,
+        Default=None,
+        Comment="标记",
+        Key=None,
+    )
+    c.update(values)
+    return c
+
+
+@pytest.mark.parametrize(
+    "key, values",
+    [
+        ("Default", (1, True)),
+        ("Length", (1, 1.0, True)),
+        ("Comment", (1, 1.0)),
+        ("Name", (1, 1.0)),
+    ],
+)
+def test_interner_keeps_equal_values_of_other_types_apart(key, values):
+    interner = FieldInterner()
+    for value in values:
+        c = _template(**{key: value})
+        assert interner.field(c).clause() == Field(*c.values()).clause()
+    assert interner.misses == len(values)
+
+
+def test_parse_interns_only_with_interner():
+    template = dict(Table="t", Table_zh="表", Fields=[_template(), _template()])
+    table = ddlgenerator.parse(template)
+    assert table.columns[0] is not table.columns[1]
+
+    interner = FieldInterner()
+    table = ddlgenerator.parse(template, interner=interner)
+    assert table.columns[0] is table.columns[1]
+    assert (interner.hits, interner.misses) == (1, 1)
+    assert table.clause() == ddlgenerator.parse(template).clause()
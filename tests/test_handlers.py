@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf8
+import json
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+
+import tornado.testing
+import tornado.web
+
+from sqlgen.handlers import UploadHandler
+from sqlgen.store import DocumentStore
+
+TEMPLATE = Path(__file__).parent.joinpath("excel_template.xlsx")
+
+
+class UploadHandlerTest(tornado.testing.AsyncHTTPTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = DocumentStore(self.tmp.name)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmp.cleanup()
+
+    def get_app(self):
+        return tornado.web.Application(
+            [(r"/upload", UploadHandler, {"store": self.store, "max_bytes": 1024**2})]
+        )
+
+    def upload(self, name):
+        return self.fetch(
+            f"/upload?name={quote(name)}",
+            method="POST",
+            body=TEMPLATE.read_bytes(),
+        )
+
+    def test_name_decoded_once(self):
+        for name in ("a%41 b.xlsx", "100%.xlsx", "设计 文档.xlsx"):
+            response = self.upload(name)
+            assert response.code == 200, response.body
+            assert json.loads(response.body)["name"] == name
+        assert self.store.list()[0]["names"] == [
+            "a%41 b.xlsx",
+            "100%.xlsx",
+            "设计 文档.xlsx",
+        ]
+
+    def test_path_of_name_dropped(self):
+        response = self.upload("C:\\docs\\x.xlsx")
+        assert json.loads(response.body)["name"] == "x.xlsx"
+        assert self.upload("x.txt").code == 400
@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# -*- coding: utf8
+from sqlgen.metrics import Counter, Gauge, Histogram, Registry
+
+
+def _series(text):
+    return [line for line in text.splitlines() if not line.startswith("#")]
+
+
+def test_worker_label_on_every_series():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ["code"]))
+    seconds = registry.register(Histogram("seconds", "Seconds", buckets=(1,)))
+    registry.register(Gauge("depth", "Depth", lambda: 3))
+    requests.inc(code="200")
+    seconds.observe(0.5)
+
+    registry.set_labels(worker=2)
+    series = _series(registry.render())
+    assert series == [
+        'requests_total{worker="2",code="200"} 1.0',
+        'seconds_bucket{worker="2",le="1.0"} 1.0',
+        'seconds_bucket{worker="2",le="+Inf"} 1.0',
+        'seconds_sum{worker="2"} 0.5',
+        'seconds_count{worker="2"} 1.0',
+        'depth{worker="2"} 3.0',
+    ]
+
+
+def test_no_labels():
+    registry = Registry()
+    registry.register(Gauge("depth", "Depth", lambda: 3))
+    assert _series(registry.render()) == ["depth 3.0"]
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+# -*- coding: utf8
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sqlgen.exceptions import ServerBusy
+from sqlgen.pool import MIN_QUEUE, WorkerPool
+
+
+def test_default_queue_takes_concurrent_users():
+    pool = WorkerPool(max_workers=1, timeout=60, kind="thread")
+    assert pool.max_queue == MIN_QUEUE
+    release = threading.Event()
+    users = 20
+    try:
+        # every user submits while the single worker is still busy
+        with ThreadPoolExecutor(max_workers=users) as clients:
+            futures = list(
+                clients.map(lambda _: pool.submit(release.wait, 60), range(users))
+            )
+            assert pool.depth == users
+            release.set()
+            assert all(_.result(timeout=60) for _ in futures)
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.rejected == 0
+    assert pool.depth == 0
+
+
+def test_full_queue_rejects():
+    pool = WorkerPool(max_workers=1, max_queue=2, timeout=60, kind="thread")
+    release = threading.Event()
+    try:
+        futures = [pool.submit(release.wait, 60) for _ in range(2)]
+        with pytest.raises(ServerBusy):
+            pool.submit(release.wait, 60)
+        release.set()
+        assert all(_.result(timeout=60) for _ in futures)
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.rejected == 1
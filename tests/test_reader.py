@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+Field list boundaries of worksheets, on every reader backend
+"""
+import pytest
+
+from sqlgen import reader
+from tests.benchmark import workbook
+
+LABELS = [["库名", "db_test"], ["表名", "t_test"], ["表中文名", "测试表"]]
+
+
+def _field(seq, name):
+    return [seq, name, f"{name}中文名", "", "varchar", 32, "Y", "", "", "", ""]
+
+
+def _names(tmp_path, read_type, rows):
+    path = tmp_path.joinpath("template.xlsx")
+    workbook.write_rows(str(path), [rows])
+    template = reader.parse(str(path), read_type=read_type)
+    return [_["Name"] for _ in template["Fields"]]
+
+
+@pytest.fixture(params=reader.READ_TYPES)
+def read_type(request):
+    return request.param
+
+
+def test_notes_under_fields(tmp_path, read_type):
+    rows = LABELS + [workbook.HEADER, _field(1, "a"), _field(2, "b")]
+    rows += [
+        [],
+        ["需求详述："],
+        ["1", "字段 a 取自上游"],
+        [3, "numbered note", "", "", "varchar"],
+        ["Notes", "", "", "", "varchar"],
+        _field(3, "after_notes"),
+    ]
+    assert _names(tmp_path, read_type, rows) == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "seqs, expected",
+    [
+        # duplicated numbers are skipped, the fields after them kept
+        ((1, 2, 2, 3), ["f0", "f1", "f3"]),
+        ((1, 2, 1, 3), ["f0", "f1", "f3"]),
+        # a gap ends the fields unless the missing number follows
+        ((1, 2, 4, 5), ["f0", "f1"]),
+        ((1, 2, 4, 3), ["f0", "f1", "f3"]),
+        # numbers as text cells
+        (("1", "2", "3"), ["f0", "f1", "f2"]),
+    ],
+)
+def test_sequence_numbers(tmp_path, read_type, seqs, expected):
+    fields = [_field(seq, f"f{i}") for i, seq in enumerate(seqs)]
+    rows = LABELS + [workbook.HEADER] + fields
+    assert _names(tmp_path, read_type, rows) == expected
+
+
+def test_blank_first_cell_inside_fields(tmp_path, read_type):
+    rows = LABELS + [
+        workbook.HEADER,
+        _field(1, "a"),
+        _field("", "continued"),
+        [],
+        _field(2, "b"),
+    ]
+    assert _names(tmp_path, read_type, rows) == ["a", "b"]
+
+
+def test_sequence_row_above_header(tmp_path, read_type):
+    rows = LABELS + [
+        _field(1, "stray"),
+        [2, "预计数据量"],
+        workbook.HEADER,
+        _field(1, "a"),
+        _field(2, "b"),
+    ]
+    assert _names(tmp_path, read_type, rows) == ["a", "b"]
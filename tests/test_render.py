@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+compat DDL pinned to the output of sqlgen 0.1.6, rendered by its f-string
+template, golden files were generated by that release
+"""
+import io
+from pathlib import Path
+
+import pytest
+
+from sqlgen import ddlgenerator, reader, render
+from tests.benchmark import workbook
+
+HERE = Path(__file__).parent
+GOLDEN = HERE.joinpath("golden")
+
+
+def _tables(path):
+    with reader.open_workbook(path) as book:
+        return [
+            ddlgenerator.parse(book.parse(index), interner=ddlgenerator.FieldInterner())
+            for index in range(book.nsheets)
+        ]
+
+
+@pytest.fixture(scope="module", params=["excel_template", "synthetic"])
+def case(request, tmp_path_factory):
+    if request.param == "excel_template":
+        path = HERE.joinpath("excel_template.xlsx")
+    else:
+        # unique keys and the other field kinds missing from the fixture
+        path = tmp_path_factory.mktemp("render").joinpath("synthetic.xlsx")
+        workbook.write_workbook(str(path), sheets=3, fields=30, seed=7)
+    golden = GOLDEN.joinpath(f"{request.param}.sql").read_text(encoding="utf8")
+    return _tables(path), golden
+
+
+def test_compat_matches_golden(case):
+    tables, golden = case
+    assert "\n".join(table.clause() for table in tables) == golden
+    assert "\n".join(table.clause("compat") for table in tables) == golden
+
+
+def test_write_matches_render(case):
+    tables, _ = case
+    for style in render.STYLES:
+        for table in tables:
+            stream = io.StringIO()
+            render.write(table, stream, style)
+            assert stream.getvalue() == render.render(table, style)
+
+
+def test_invalid_style(case):
+    tables, _ = case
+    with pytest.raises(ValueError):
+        tables[0].clause("fancy")
@@ -0,0 +1,30 @@
+#!/usr/bin/python
+# -*- coding: utf8
+import subprocess
+import sys
+
+import pytest
+
+from sqlgen import catalog, reserved
+
+
+@pytest.mark.parametrize("word", ["XID", "XML", "ACCOUNT"])
+def test_keywords(word):
+    assert reserved.is_reserved_words(word)
+    assert word in reserved.sql_reserved_words
+
+
+def test_keywords_without_stray_semicolon():
+    assert not reserved.is_reserved_words("ACCOUNT;")
+    assert not reserved.is_reserved_words("XIDXML")
+    assert not [w for w in reserved.sql_reserved_words if not w.isidentifier()]
+
+
+def test_is_reserved_words_reexported():
+    assert reserved.is_reserved_words is catalog.is_reserved_words
+
+
+@pytest.mark.parametrize("module", ["sqlgen.reserved", "sqlgen.catalog"])
+def test_imported_first(module):
+    code = f"import {module}; from sqlgen.reserved import is_reserved_words"
+    subprocess.run([sys.executable, "-c", code], check=True)
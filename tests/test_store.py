@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf8
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlgen import reader, store as store_module
+from sqlgen.store import DocumentStore
+
+TEMPLATE = Path(__file__).parent.joinpath("excel_template.xlsx")
+
+
+def test_sheets_read_outside_lock(tmp_path, monkeypatch):
+    store = DocumentStore(tmp_path)
+    held = list()
+
+    def sheet_tables(source):
+        held.append(store._lock._depth)
+        return reader.sheet_tables(source)
+
+    monkeypatch.setattr(
+        store_module, "reader", SimpleNamespace(sheet_tables=sheet_tables)
+    )
+
+    content = TEMPLATE.read_bytes()
+    doc = store.add("a.xlsx", content)
+    assert held == [0]
+    assert doc["tables"] == ["t_sz_ipoguidancestate"]
+    assert store.path(doc["digest"]).read_bytes() == content
+
+    # stored once, the workbook is not read again
+    again = store.add("b.xlsx", content)
+    assert held == [0]
+    assert again["names"] == ["a.xlsx", "b.xlsx"]
+    assert again["tables"] == doc["tables"]
+    assert [_.name for _ in store.objects.iterdir()] == [store.path(doc["digest"]).name]
+
+
+def test_evictions_shared_by_processes(tmp_path):
+    # one store per server process, on the same root
+    first, second = DocumentStore(tmp_path), DocumentStore(tmp_path)
+    content = TEMPLATE.read_bytes()
+    first.add("a.xlsx", content)
+    second.add("b.xlsx", content + b"\0")
+    assert second.last_sweep is None
+
+    assert [_["name"] for _ in first.sweep(max_files=1)] == ["a.xlsx"]
+    assert second.evicted_count == 1
+    assert second.evicted_bytes == len(content)
+    assert [_["name"] for _ in second.evictions] == ["a.xlsx"]
+
+    assert [_["name"] for _ in second.sweep(max_bytes=1)] == ["b.xlsx"]
+    for store in (first, second):
+        assert store.evicted_count == 2
+        assert store.evicted_bytes == 2 * len(content) + 1
+        assert [_["name"] for _ in store.evictions] == ["b.xlsx", "a.xlsx"]
+        assert store.last_sweep is not None
+    assert len(first) == 0
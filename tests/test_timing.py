@@ -0,0 +1,23 @@
+#!/usr/bin/python
+# -*- coding: utf8
+from sqlgen import timing
+
+
+def test_format_table_counters():
+    with timing.record() as recorder:
+        with timing.sheet(0):
+            with timing.span("build"):
+                timing.count("fields_created", 25)
+        timing.count("template_cache_hits")
+    tables = recorder.format_table().split("\n\n")
+    assert len(tables) == 3
+    assert tables[2].splitlines() == [
+        "counter              value",
+        "fields_created       25",
+        "template_cache_hits  1",
+    ]
+
+
+def test_format_rows():
+    text = timing.format_rows(("a", "bb"), [("ccc", ""), ("d", "e")])
+    assert text.splitlines() == ["a    bb", "ccc", "d    e"]
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf8
+from pathlib import Path
+
+import pytest
+
+from sqlgen import web
+from sqlgen.cache import LRUCache
+from sqlgen.pool import WorkerPool
+
+TEMPLATE = str(Path(__file__).parent.joinpath("excel_template.xlsx"))
+
+
+@pytest.fixture
+def worker_pool(monkeypatch):
+    pool = WorkerPool(max_workers=2, max_queue=4, timeout=60, kind="thread")
+    monkeypatch.setattr(web, "worker_pool", pool)
+    monkeypatch.setattr(web, "ddl_cache", LRUCache(maxsize=128))
+    monkeypatch.setattr(web, "template_cache", None)
+    yield pool
+    pool.shutdown()
+
+
+def test_iter_docs_more_docs_than_queue(worker_pool):
+    docs = [(TEMPLATE, f"doc-{i}") for i in range(30)]
+    tables = {i: list() for i in range(len(docs))}
+    done = dict()
+    for i, table, error in web.iter_docs(docs, (0,)):
+        if table is not None:
+            tables[i].append(table)
+        else:
+            done[i] = error
+
+    assert worker_pool.rejected == 0
+    assert done == {i: None for i in range(len(docs))}
+    assert all(len(t) == 1 for t in tables.values())
+    assert len({t[0][1] for t in tables.values()}) == 1
+    assert worker_pool.depth == 0
+
+
+def test_iter_docs_failed_doc(worker_pool, tmp_path):
+    broken = tmp_path.joinpath("broken.xlsx")
+    broken.write_bytes(b"not a workbook")
+    docs = [(TEMPLATE, "good"), (str(broken), "broken"), (TEMPLATE, "good-2")]
+    done = {i: error for i, table, error in web.iter_docs(docs, (0,)) if not table}
+
+    assert done[0] is None and done[2] is None
+    assert done[1] is not None
+    assert web.ddl_cache.get(("broken", (0,))) is None
+    # served from the DDL cache the second time
+    hits = web.ddl_cache.hits
+    assert [table for _, table, _ in web.iter_docs(docs[:1], (0,)) if table]
+    assert web.ddl_cache.hits == hits + 1
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf8
+"""
+The stdlib .xlsx reader backend against xlrd, on the same workbooks
+"""
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from sqlgen import ddlgenerator, reader
+from tests.benchmark import workbook
+
+TEMPLATE = Path(__file__).parent.joinpath("excel_template.xlsx")
+
+SHARED_STRINGS = [
+    "<si><t>plain</t></si>",
+    # rich text runs, formatting is dropped
+    "<si><r><t>ri</t></r><r><rPr><b/></rPr><t>ch</t></r></si>",
+    '<si><t xml:space="preserve"> padded </t></si>',
+    "<si><t>a_x0042_c</t></si>",
+    # phonetic runs are not part of the text
+    '<si><t>phon</t><rPh sb="0" eb="1"><t>PH</t></rPh></si>',
+]
+
+ROWS = [
+    # shared, rich, inline, rich inline and formula strings
+    '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>'
+    '<c r="C1" t="inlineStr"><is><t>inline</t></is></c>'
+    '<c r="D1" t="inlineStr"><is><r><t>in</t></r><r><t>rich</t></r></is></c>'
+    '<c r="E1" t="str"><f>A1</f><v>calc</v></c><c r="F1" t="s"><v>2</v></c>'
+    '<c r="G1" t="s"><v>3</v></c><c r="H1" t="s"><v>4</v></c></row>',
+    # booleans, errors, numbers and a shared string cell without value
+    '<row r="2"><c r="A2" t="b"><v>1</v></c><c r="B2" t="b"><v>0</v></c>'
+    '<c r="C2" t="e"><v>#DIV/0!</v></c><c r="D2" t="e"><v>#N/A</v></c>'
+    '<c r="E2"><v>3.5</v></c><c r="F2"><v>42</v></c><c r="G2" t="s"/></row>',
+    # sparse rows and cells, located by r= only
+    '<row r="5"><c r="B5"><v>7</v></c><c r="E5" t="s"><v>0</v></c></row>',
+    '<row r="6"><c r="C6" t="s"><v>1</v></c></row>',
+    '<row r="9"><c r="AB9"><v>1</v></c></row>',
+    # neither row nor cells located
+    '<row><c><v>1</v></c><c t="s"><v>0</v></c></row>',
+]
+
+
+def _write_cells(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            workbook.CONTENT_TYPES.format(
+                sheets=workbook.CONTENT_TYPE_SHEET.format(n=1)
+            ),
+        )
+        zf.writestr("_rels/.rels", workbook.ROOT_RELS)
+        zf.writestr(
+            "xl/workbook.xml",
+            workbook.WORKBOOK.format(
+                sheets=workbook.WORKBOOK_SHEET.format(name="Cells", n=1)
+            ),
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            workbook.WORKBOOK_RELS.format(
+                sheets=workbook.WORKBOOK_RELS_SHEET.format(n=1), styles=2, strings=3
+            ),
+        )
+        zf.writestr("xl/styles.xml", workbook.STYLES)
+        zf.writestr(
+            "xl/worksheets/sheet1.xml", workbook.WORKSHEET.format(rows="".join(ROWS))
+        )
+        zf.writestr(
+            "xl/sharedStrings.xml",
+            workbook.SHARED_STRINGS.format(
+                count=len(SHARED_STRINGS), strings="".join(SHARED_STRINGS)
+            ),
+        )
+    return path
+
+
+def _rows(file_path, read_type, index=0):
+    """rows with values, without trailing blank cells: xlrd yields blank rows
+    and pads rows to the sheet width, the xlsx backend does neither
+    """
+    with reader.open_workbook(file_path, read_type) as book:
+        stream = book.rows(index)
+        try:
+            rows = [list(row) for row in stream]
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+    ret = list()
+    for row in rows:
+        while row and row[-1] == "":
+            row.pop()
+        if row:
+            ret.append(row)
+    return ret
+
+
+@pytest.fixture(scope="module")
+def synthetic(tmp_path_factory):
+    path = tmp_path_factory.mktemp("xlsx").joinpath("synthetic.xlsx")
+    workbook.write_workbook(str(path), sheets=3, fields=40, seed=1)
+    return path
+
+
+def test_cells_match_xlrd(tmp_path):
+    path = _write_cells(tmp_path.joinpath("cells.xlsx"))
+    rows = _rows(path, "xlsx")
+    assert rows == _rows(path, "excel")
+    assert rows[0] == [
+        "plain",
+        "rich",
+        "inline",
+        "inrich",
+        "calc",
+        " padded ",
+        "aBc",
+        "phon",
+    ]
+    assert rows[1] == [1, 0, 0x07, 0x2A, 3.5, 42.0]
+    assert rows[2] == ["", 7.0, "", "", "plain"]
+    assert len(rows[4]) == 28
+
+
+def test_fixture_rows_match_xlrd():
+    assert _rows(TEMPLATE, "xlsx") == _rows(TEMPLATE, "excel")
+
+
+@pytest.mark.parametrize("source", ["fixture", "synthetic"])
+def test_templates_and_ddl_match_xlrd(source, synthetic):
+    path = TEMPLATE if source == "fixture" else synthetic
+    with reader.open_workbook(path, "excel") as book:
+        sheets = range(book.nsheets)
+    for sheet in sheets:
+        expected = reader.parse(path, read_type="excel", index=sheet)
+        template = reader.parse(path, read_type="xlsx", index=sheet)
+        assert template == expected
+        assert (
+            ddlgenerator.parse(template).clause()
+            == ddlgenerator.parse(expected).clause()
+        )